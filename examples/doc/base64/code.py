@@ -20,28 +20,35 @@
 
 
 # Imports
-import base64
-import json
+# (Note that the heavier `base64`, `binascii` and `json` modules are only imported where they are used, so that a call with invalid
+# arguments doesn't pay for them)
 import os
 import sys
-import yaml
+import typing
+
+
+# Constants
+# The number of raw bytes to encode at a time when streaming. Must be a multiple of 3, so that no padding is generated halfway.
+STREAM_CHUNK_SIZE = 3 * 64 * 1024
 
 
 # The functions
-def encode(s: str) -> str:
+def encode_stream(s: str, out: typing.BinaryIO):
     """
-        Encodes a given string as Base64, and returns the result as a string
-        again.
+        Encodes a given string as Base64, writing the result to the given
+        binary stream in chunks instead of returning it.
+
+        This way, the encoded result never has to be in memory as a whole.
     """
 
-    # First, get the raw bytes of the string (to have correct padding and such)
-    b = s.encode("utf-8")
+    import binascii
 
-    # We simply encode using the b64encode function
-    b = base64.b64encode(b)
+    # Get the raw bytes of the string once, and then view them without copying
+    view = memoryview(s.encode("utf-8"))
 
-    # We return the value, but not after interpreting the raw bytes returned by the function as a string
-    return b.decode("utf-8")
+    # Encode the bytes chunk-by-chunk, writing each chunk as soon as it is done
+    for i in range(0, len(view), STREAM_CHUNK_SIZE):
+        out.write(binascii.b2a_base64(view[i:i + STREAM_CHUNK_SIZE], newline=False))
 
 
 def decode(b: str) -> str:
@@ -49,14 +56,11 @@ def decode(b: str) -> str:
         Decodes the given Base64 string back to plain text.
     """
 
-    # Remove any newlines that may be present from line splitting first, as these are not part of the Base64 character set
-    b = b.replace("\n", "")
+    import base64
 
-    # Decode using the base64 module again
-    s = base64.b64decode(b)
-
-    # Finally, we return the value, once again casting it
-    return s.decode("utf-8")
+    # Decode using the base64 module again. Note that this already discards any newlines that may be present from line splitting, as
+    # these are not part of the Base64 character set. Finally, we return the value, once again casting it
+    return base64.b64decode(b).decode("utf-8")
 
 
 # The entrypoint of the script
@@ -66,18 +70,27 @@ if __name__ == "__main__":
         print(f"Usage: {sys.argv[0]} encode|decode")
         exit(1)
 
-    # If it checks out, call the appropriate function
+    # If it checks out, we need the JSON module to parse the input
+    import json
+
+    # Call the appropriate function
     command = sys.argv[1]
     if command == "encode":
-        # Parse the input as JSON, then pass that to the `encode` function
+        # Parse the input as JSON, then stream the encoded result to stdout directly. Since Base64 never contains quotes, we can simply
+        # wrap it in single quotes to make it a valid YAML string. Everything goes through the binary stream, so the text and binary writes can't get reordered
         arg = json.loads(os.environ["INPUT"])
-        result = encode(arg)
+        out = sys.stdout.buffer
+        out.write(b"output: '")
+        encode_stream(arg, out)
+        out.write(b"'\n")
+        out.flush()
     else:
-        # Parse the input as JSON, then pass that to the `encode` function
+        # Parse the input as JSON, then pass that to the `decode` function
         arg = json.loads(os.environ["INPUT"])
         result = decode(arg)
 
-    # Print the result with the YAML package
-    print(yaml.dump({ "output": result }))
+        # Print the result as YAML. A JSON string is also a valid YAML double-quoted string, so we can let the JSON package do the quoting for
+        # us. Non-ASCII characters are kept as-is, since YAML can't read the surrogate pairs JSON would otherwise escape them to
+        print(f"output: {json.dumps(result, ensure_ascii=False)}")
 
     # Done!
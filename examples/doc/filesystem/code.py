@@ -21,9 +21,9 @@
 
 
 # Imports
+# (Note that the `json` module is only imported once the arguments check out, so that a call with invalid arguments doesn't pay for it)
 import os
 import sys
-import yaml
 
 
 
@@ -35,9 +35,16 @@ def write(name: str, contents: str) -> int:
 
     # We wrap the writing in a try/catch so we may catch any errors
     try:
-        # Open the file and write the content
-        with open(f"/data/{name}.txt", "w") as f:
-            f.write(contents)
+        # Open the file and write the content. We use the raw file descriptor (instead of `open()`) to skip Python's buffering layers,
+        # which buy us nothing when writing everything in one go
+        data = memoryview(contents.encode("utf-8"))
+        fd = os.open(f"/data/{name}.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # A single write may be partial, so keep going until everything is written
+            while len(data) > 0:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
 
         # Return 0 (i.e., "success")
         return 0
@@ -55,9 +62,16 @@ def read(name: str) -> str:
 
     # Once again we wrap the reading in a try/catch so we may catch any errors
     try:
-        # Open the file and read the content
-        with open(f"/data/{name}.txt", "r") as f:
-            content = f.read()
+        # Open the file and read the content. Like with writing, we use the raw file descriptor and read it as a whole
+        fd = os.open(f"/data/{name}.txt", os.O_RDONLY)
+        try:
+            # Read the size reported by the filesystem, but keep going until the end in case the file is larger by now
+            chunks = [ os.read(fd, max(os.fstat(fd).st_size, 1)) ]
+            while len(chunks[-1]) > 0:
+                chunks.append(os.read(fd, 65536))
+        finally:
+            os.close(fd)
+        content = b"".join(chunks).decode("utf-8")
 
         # Return the string
         return content
@@ -76,13 +90,18 @@ if __name__ == "__main__":
         print(f"Usage: {sys.argv[0]} write|read")
         exit(1)
 
-    # If it checks out, call the appropriate function
+    # If it checks out, we need the JSON module to print the output
+    import json
+
+    # Call the appropriate function
     command = sys.argv[1]
     if command == "write":
-        # Write the file and print the error code
-        print(yaml.dump({ "code": write(os.environ["NAME"], os.environ["CONTENTS"]) }))
+        # Write the file and print the error code (as YAML)
+        print(f"code: {write(os.environ['NAME'], os.environ['CONTENTS'])}")
     else:
-        # Read the file and print the contents
-        print(yaml.dump({ "contents": read(os.environ["NAME"]) }))
+        # Read the file and print the contents (as YAML). A JSON string is also a valid YAML double-quoted string, so we can let the JSON
+        # package do the quoting for us. Non-ASCII characters are kept as-is, since YAML can't read the surrogate pairs JSON would
+        # otherwise escape them to
+        print(f"contents: {json.dumps(read(os.environ['NAME']), ensure_ascii=False)}")
 
     # Done!
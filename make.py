@@ -18,17 +18,31 @@ from __future__ import annotations
 
 import abc
 import argparse
+import bisect
+import concurrent.futures
+import functools
 import hashlib
-import http
+import http.client
 import json
 import os
+import platform
+import re
 # import requests
+import shlex
+import shutil
 import subprocess
 import sys
-import tarfile
+import threading
 import time
+try:
+    import tomllib
+except ImportError:
+    # Fall back to the backport on Python versions before 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
 import typing
-import urllib.request
 
 
 ##### CONSTANTS #####
@@ -45,6 +59,35 @@ WORKER_SERVICES = [ "prx", "job", "reg" ]
 # List of auxillary services in a worker node in an instance
 AUX_WORKER_SERVICES = []
 
+# Maps the (lowercase) architecture and OS names we accept to the internal names used by Arch and Os
+ARCH_ALIASES = { "x86_64": "x86_64", "amd64": "x86_64", "aarch64": "aarch64", "arm64": "aarch64" }
+OS_ALIASES   = { "linux": "linux", "darwin": "darwin", "macos": "darwin" }
+
+# Matches ANSI escape codes (e.g., colours) in a piece of text
+ANSI_ESCAPE_RE = re.compile(r"\033\[[^m]*m")
+
+# Matches the variables substituted by resolve_args(); longer names come first so they are never shadowed by a shorter prefix
+RESOLVE_ARGS_RE = re.compile(r"\$(" + "|".join(sorted([ "RELEASE", "OS", "RUST_OS", "ARCH", "RUST_ARCH", "DOCKER_ARCH", "JUICEFS_ARCH", "CWD", "VERSION" ], key=len, reverse=True)) + ")")
+
+# The hashlib algorithm used to fingerprint files in the hash cache. Not used for security, so we pick whatever is fastest
+# (SHA-1 is hardware-accelerated on most modern CPUs). Changing it invalidates the cache once, since the name prefixes every hash
+HASH_ALGORITHM = "sha1"
+
+# The size of the byte ranges that large downloads are split into, and how many of them are fetched in parallel
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DOWNLOAD_WORKERS    = 8
+# The size of the blocks in which a download is read from the socket, and the time (in seconds) between two progress updates
+DOWNLOAD_BLOCK_SIZE      = 1024 * 1024
+DOWNLOAD_SAMPLE_INTERVAL = 0.25
+# The weight of the newest sample in the (exponential moving average) download rate that is shown
+DOWNLOAD_RATE_SMOOTHING = 0.3
+# The maximum number of redirects to follow when downloading something
+HTTP_MAX_REDIRECTS = 10
+
+# The thresholds at which to_bytes() switches to the next unit, and the (divisor, suffix) of each unit
+BYTE_THRESHOLDS = [ 1000, 1000000, 1000000000, 1000000000000, 1000000000000000 ]
+BYTE_UNITS      = [ (1, "bytes"), (1000, "KB"), (1000000, "MB"), (1000000000, "GB"), (1000000000000, "TB"), (1000000000000000, "PB") ]
+
 # The directory where we compile OpenSSL to
 OPENSSL_DIR = "./target/openssl/$ARCH"
 
@@ -94,6 +137,20 @@ OPENSSL_FILES = [
 
 
 ##### HELPER FUNCTIONS #####
+@functools.lru_cache(maxsize=1)
+def stdout_is_tty() -> bool:
+    """
+        Returns True if stdout is connected to a terminal, and False
+        otherwise.
+
+        Cached, since this doesn't change while we run (and would otherwise
+        cost a syscall on every progress bar redraw).
+    """
+
+    # isatty is not always implemented, #6223.
+    return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+
+@functools.lru_cache(maxsize=1)
 def supports_color():
     """
         Returns True if the running system's terminal supports color, and False
@@ -104,9 +161,15 @@ def supports_color():
     plat = sys.platform
     supported_platform = plat != 'Pocket PC' and (plat != 'win32' or
                                                   'ANSICON' in os.environ)
-    # isatty is not always implemented, #6223.
-    is_a_tty = hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
-    return supported_platform and is_a_tty
+    return supported_platform and stdout_is_tty()
+
+# The colour strings used by the printing functions below and when building targets (computed once, since the terminal doesn't change while we run)
+ERROR_START   = "\033[91;1m" if supports_color() else ""
+WARNING_START = "\033[93;1m" if supports_color() else ""
+DEBUG_START   = "\033[90m" if supports_color() else ""
+BOLD_START    = "\033[1m" if supports_color() else ""
+FAILED_START  = "\033[31;1m" if supports_color() else ""
+COLOUR_END    = "\033[0m" if supports_color() else ""
 
 def wrap_description(text: str, indent: int, max_width: int, skip_first_indent: bool = False) -> str:
     """
@@ -119,103 +182,72 @@ def wrap_description(text: str, indent: int, max_width: int, skip_first_indent:
     if indent >= max_width:
         raise ValueError(f"indent must be lower than max_width (assertion {indent} < {max_width} fails)")
 
-    # Go through the text word-by-word
-    result = f"{(' ' * indent) if not skip_first_indent else ''}"
+    # Go through the text word-by-word, collecting the pieces of the result to join them at the end
+    result = [ ' ' * indent ] if not skip_first_indent else []
     w = indent
     for word in text.split():
         # Get the length of the word minus the ansi escaped codes
-        word_len = 0
-        i = 0
-        while i < len(word):
-            # Get the char
-            c = word[i]
-
-            # Switch on ansi escape character or not
-            if c == '\033':
-                c = word[i + 1]
-                if c == '[':
-                    # It is ansi; skip until and including the 'm'
-                    j = 0
-                    while i + j < len(word) and word[i + j] != 'm':
-                        j += 1
-                    i += 1 + j + 1
-
-            # Go to the next char
-            word_len += 1
-            i += 1
+        word_len = len(ANSI_ESCAPE_RE.sub("", word))
 
         # Check if this word fits as a whole
         if w + word_len < max_width:
             # It does, add it
-            result += word
-            w      += word_len
+            result.append(word)
+            w += word_len
         else:
             # Otherwise, always go to a new line
-            result += f"\n{' ' * indent}"
-            w       = indent
+            result.append(f"\n{' ' * indent}")
+            w = indent
 
             # Now pop entire lines off the word if it's always too long
             while w + word_len >= max_width:
                 # Write the front line worth of characters
-                result += f"{word[:max_width - w]}\n{' ' * indent}"
-                w       = indent
+                result.append(f"{word[:max_width - w]}\n{' ' * indent}")
+                w         = indent
                 # Shrink the word
                 word      = word[max_width - w:]
                 word_len -= max_width - w
 
             # The word *must* fit now, so write it
-            result += word
-            w      += word_len
+            result.append(word)
+            w += word_len
 
         # If it still fits, add a space
         if w + 1 < max_width:
-            result += ' '
-            w      += 1
+            result.append(' ')
+            w += 1
 
     # Done
-    return result
+    return "".join(result)
 
 def to_bytes(val: int) -> str:
     """
         Pretty-prints the given value to some byte count.
     """
 
-    if val < 1000:
-        return f"{val:.2f} bytes"
-    elif val < 1000000:
-        return f"{val / 1000:.2f} KB"
-    elif val < 1000000000:
-        return f"{val / 1000000:.2f} MB"
-    elif val < 1000000000000:
-        return f"{val / 1000000000:.2f} GB"
-    elif val < 1000000000000000:
-        return f"{val / 1000000000000:.2f} TB"
-    else:
-        return f"{val / 1000000000000000:.2f} PB"
+    # Find the largest unit that the value reaches
+    div, suffix = BYTE_UNITS[bisect.bisect_right(BYTE_THRESHOLDS, val)]
+    return f"{val / div:.2f} {suffix}"
 
 def perror(text: str = "", colour: bool = True):
     """
         Writes text to stderr, as an Error.
     """
 
-    # Get colours
-    start = "\033[91;1m" if colour and supports_color() else ""
-    end   = "\033[0m" if colour and supports_color() else ""
-
     # Print it
-    print(f"{start}[ERROR] {text}{end}", file=sys.stderr)
+    with print_lock:
+        if colour: print(f"{ERROR_START}[ERROR] {text}{COLOUR_END}", file=sys.stderr)
+        else: print(f"[ERROR] {text}", file=sys.stderr)
 
 def pwarning(text: str = "", colour: bool = True):
     """
         Writes text to srderr, as a warning string.
     """
 
-    # Get colours
-    start = "\033[93;1m" if colour and supports_color() else ""
-    end   = "\033[0m" if colour and supports_color() else ""
-
     # Print it
-    print(f"{start}[warning] {text}{end}", file=sys.stderr)
+    with print_lock:
+        if colour: print(f"{WARNING_START}[warning] {text}{COLOUR_END}", file=sys.stderr)
+        else: print(f"[warning] {text}", file=sys.stderr)
 
 def pdebug(text: str = "", colour: bool = True):
     """
@@ -225,12 +257,10 @@ def pdebug(text: str = "", colour: bool = True):
     # Skip if not debugging
     if not debug: return
 
-    # Get colours
-    start = "\033[90m" if colour and supports_color() else ""
-    end   = "\033[0m" if colour and supports_color() else ""
-
     # Print it
-    print(f"{start}[debug] {text}{end}")
+    with print_lock:
+        if colour: print(f"{DEBUG_START}[debug] {text}{COLOUR_END}")
+        else: print(f"[debug] {text}")
 
 def cancel(text: str = "", code = 1, colour: bool = True) -> typing.NoReturn:
     """
@@ -240,6 +270,40 @@ def cancel(text: str = "", code = 1, colour: bool = True) -> typing.NoReturn:
     perror(text, colour=colour)
     exit(code)
 
+@functools.lru_cache
+def resolve_subs(dev: bool, os_: Os, arch: Arch, version: str, cwd: str) -> dict[str, str]:
+    """
+        Returns the values that resolve_args() substitutes for each variable
+        (without the '$'), given the relevant arguments.
+
+        Cached, since the arguments are fixed for most of the script's run.
+    """
+
+    return {
+        "RELEASE"      : "release" if not dev else "debug",
+        "OS"           : os_.to_rust(),
+        "RUST_OS"      : os_.to_rust(),
+        "ARCH"         : arch.to_rust(),
+        "RUST_ARCH"    : arch.to_rust(),
+        "DOCKER_ARCH"  : arch.to_docker(),
+        "JUICEFS_ARCH" : arch.to_juicefs(),
+        "CWD"          : cwd,
+        "VERSION"      : version,
+    }
+
+@functools.lru_cache(maxsize=4096)
+def resolve_text(text: str, dev: bool, os_: Os, arch: Arch, version: str, cwd: str) -> str:
+    """
+        Implements resolve_args() given the relevant arguments, caching the
+        result per text.
+    """
+
+    # Collect the values to substitute (only computed once per set of arguments)
+    subs = resolve_subs(dev, os_, arch, version, cwd)
+
+    # Replace them all in a single pass over the text
+    return RESOLVE_ARGS_RE.sub(lambda m: subs[m.group(1)], text)
+
 def resolve_args(text: str, args: argparse.Namespace) -> str:
     """
         Returns the same string, but with a couple of values replaced:
@@ -254,16 +318,117 @@ def resolve_args(text: str, args: argparse.Namespace) -> str:
         - `$VERSION` with the script's target Brane version (based on the '--version' flag)
     """
 
-    return text \
-        .replace("$RELEASE", "release" if not args.dev else "debug") \
-        .replace("$OS", args.os.to_rust()) \
-        .replace("$RUST_OS", args.os.to_rust()) \
-        .replace("$ARCH", args.arch.to_rust()) \
-        .replace("$RUST_ARCH", args.arch.to_rust()) \
-        .replace("$DOCKER_ARCH", args.arch.to_docker()) \
-        .replace("$JUICEFS_ARCH", args.arch.to_juicefs()) \
-        .replace("$CWD", os.getcwd()) \
-        .replace("$VERSION", args.version)
+    # The same strings are resolved many times over per build, so use the cached version
+    return resolve_text(text, args.dev, args.os, args.arch, args.version, os.getcwd())
+
+def hash_file(path: str) -> str:
+    """
+        Computes the hash of the given file, and returns it as a hexadecimal
+        string prefixed with the name of the algorithm used (e.g.,
+        'sha1:<hex>').
+
+        Raises an IOError if the file could not be read.
+    """
+
+    with open(path, "rb") as h:
+        # If available, let hashlib read the file itself (it does so without copying every chunk)
+        if sys.version_info >= (3, 11):
+            return f"{HASH_ALGORITHM}:{hashlib.file_digest(h, HASH_ALGORITHM).hexdigest()}"
+
+        # Otherwise, read the file chunk-by-chunk into a buffer that this thread reuses for every file it hashes
+        src_hash = hashlib.new(HASH_ALGORITHM)
+        buffer = getattr(hash_buffers, "buffer", None)
+        if buffer is None:
+            buffer = memoryview(bytearray(1 << 20))
+            hash_buffers.buffer = buffer
+        while True:
+            n = h.readinto(buffer)
+            if not n: break
+            src_hash.update(buffer[:n])
+        return f"{HASH_ALGORITHM}:{src_hash.hexdigest()}"
+
+def memoized_hash_file(path: str) -> str:
+    """
+        Wraps hash_file() such that every file is only hashed once per run,
+        even if it is a source of multiple targets (or is checked and then
+        cached by the same one).
+
+        The file's modification time and size are part of the key, so files
+        that are changed while we run (e.g., by a build) are hashed again.
+
+        Raises an IOError if the file could not be read.
+    """
+
+    stat = os.stat(path)
+    key  = (path, stat.st_mtime_ns, stat.st_size)
+    res  = hash_memo.get(key, None)
+    if res is None:
+        res = hash_file(path)
+        hash_memo[key] = res
+    return res
+
+def walk_files(path: str) -> typing.Iterator[str]:
+    """
+        Yields all the (non-directory) files that live in the given
+        directory, recursively.
+
+        Files are yielded lazily as the directory tree is scanned, so callers
+        may stop early without walking the entire tree.
+    """
+
+    for (dirpath, _, filenames) in os.walk(path, followlinks=True):
+        for filename in filenames:
+            yield os.path.join(dirpath, filename)
+
+def hash_cache_path(hash_cache: str, file: str) -> str:
+    """
+        Returns the path of the file in the given (absolute) hash cache
+        directory that stores the hash of the given file.
+
+        Raises a ValueError if that path would escape the hash cache.
+    """
+
+    # Since the hash cache is already absolute, normalizing is enough (and avoids a getcwd() per file)
+    hsrc = os.path.normpath(hash_cache + f"/{file}")
+    if not hsrc.startswith(hash_cache + os.sep): raise ValueError(f"Hash source '{hsrc}' is not in the hash cache ({hash_cache}); please do not escape it")
+    return hsrc
+
+def file_cache_outdated(hash_cache: str, file: str) -> bool:
+    """
+        Checks if the given source file needs recompilation according to the
+        given hash cache directory.
+
+        It needs recompilation if:
+        - The file's hash wasn't cached yet
+        - The hashes of the file & directory do not match
+    """
+
+    # Check if we know its hash
+    hsrc = hash_cache_path(hash_cache, file)
+    if not os.path.exists(hsrc):
+        pdebug(f"Cached file '{file}' marked as outdated because it has no cache entry (missing '{hsrc}')")
+        return True
+
+    # Compute the hash of the file
+    try:
+        src_hash = memoized_hash_file(file)
+    except IOError as e:
+        pwarning(f"Failed to read source file '{file}' for hashing: {e} (assuming target needs to be rebuild)")
+        return True
+
+    # Compare it with that in the file
+    try:
+        with open(hsrc, "r") as h:
+            cache_hash = h.read()
+    except IOError as e:
+        pwarning(f"Failed to read hash cache file '{hsrc}': {e} (assuming target needs to be rebuild)")
+        return True
+    if src_hash != cache_hash:
+        pdebug(f"Cached file '{file}' marked as outdated because its hash does not match that in the cache (cache file: '{hsrc}')")
+        return True
+
+    # Otherwise, no recompilation needed
+    return False
 
 def cache_outdated(args: argparse.Namespace, file: str, is_src: bool) -> bool:
     """
@@ -280,56 +445,87 @@ def cache_outdated(args: argparse.Namespace, file: str, is_src: bool) -> bool:
         Additionally, the user will be warned if the source doesn't exist.
     """
 
+    return first_cache_outdated(args, [ file ], is_src) is not None
+
+def first_cache_outdated(args: argparse.Namespace, files: list[str], is_src: bool) -> str | None:
+    """
+        Checks if any of the given source files/directories exists and needs
+        recompilation (see cache_outdated()).
+
+        The files of all given sources are hashed in parallel on one pool, and
+        we stop as soon as one of them turns out to be outdated.
+
+        Returns the first of the given paths found to be outdated, or None if
+        none of them are.
+    """
+
     # Get absolute version of the hash_cache
     hash_cache = os.path.abspath(args.cache + ("/srcs" if is_src else "/dsts"))
 
-    # Match the type of the source file
-    if os.path.isfile(file):
-        # It's a file; check if we know its hash
-        hsrc = os.path.abspath(hash_cache + f"/{file}")
-        if hsrc[:len(hash_cache)] != hash_cache: raise ValueError(f"Hash source '{hsrc}' is not in the hash cache ({hash_cache}); please do not escape it")
-        if not os.path.exists(hsrc):
-            pdebug(f"Cached file '{file}' marked as outdated because it has no cache entry (missing '{hsrc}')")
+    # Define the check for a single file (hashing releases the GIL, so running these in parallel overlaps the disk reads)
+    outdated = threading.Event()
+    def check_file(nested_file: str) -> bool:
+        # Don't bother hashing if another file already decided the answer
+        if outdated.is_set(): return False
+        if file_cache_outdated(hash_cache, nested_file):
+            outdated.set()
             return True
+        return False
 
-        # Compute the hash of the file
-        try:
-            with open(file, "rb") as h:
-                src_hash = hashlib.md5()
-                while True:
-                    data = h.read(65536)
-                    if not data: break
-                    src_hash.update(h.read())
-        except IOError as e:
-            pwarning(f"Failed to read source file '{file}' for hashing: {e} (assuming target needs to be rebuild)")
-            return True
+    pool = concurrent.futures.ThreadPoolExecutor()
+    try:
+        # Submit files while we are still walking the sources, and stop walking as soon as one is outdated
+        futures = {}
+        for file in files:
+            # Match the type of the source file
+            if os.path.isfile(file):
+                nested_files = [ file ]
+            elif os.path.isdir(file):
+                nested_files = walk_files(file)
+            else:
+                # In this case, we're sure rebuilding needs to happen (since they may be as a result from a dependency)
+                pwarning(f"Cached file '{file}' is not a file or directory (is the sources/results list up-to-date?)")
+                return file
+
+            for nested_file in nested_files:
+                if outdated.is_set(): break
+                futures[pool.submit(check_file, nested_file)] = (file, nested_file)
+            if outdated.is_set(): break
+
+        # Wait for the verdict
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                (file, nested_file) = futures[future]
+                if nested_file != file: pdebug(f"Cached directory '{file}' marked as outdated because one of its children ('{nested_file}') is outdated")
+                return file
+        return None
+    finally:
+        # Don't bother finishing the others if we already know the answer
+        pool.shutdown(cancel_futures=True)
 
-        # Compare it with that in the file
-        try:
-            with open(hsrc, "r") as h:
-                cache_hash = h.read()
-        except IOError as e:
-            pwarning(f"Failed to read hash cache file '{hsrc}': {e} (assuming target needs to be rebuild)")
-            return True
-        if src_hash.hexdigest() != cache_hash:
-            pdebug(f"Cached file '{file}' marked as outdated because its hash does not match that in the cache (cache file: '{hsrc}')")
-            return True
+def update_file_cache(hash_cache: str, file: str):
+    """
+        Updates the hash of the given source file in the given hash cache
+        directory.
+    """
 
-        # Otherwise, no recompilation needed
-        return False
+    # Attempt to compute the hash
+    try:
+        src_hash = memoized_hash_file(file)
+    except IOError as e:
+        pwarning(f"Failed to read source file '{file}' to compute hash: {e} (compilation will likely always happen until fixed)")
+        return
 
-    elif os.path.isdir(file):
-        # It's a dir; recurse
-        for nested_file in os.listdir(file):
-            if cache_outdated(args, os.path.join(file, nested_file), is_src):
-                pdebug(f"Cached directory '{file}' marked as outdated because one of its children ('{nested_file}') is outdated")
-                return True
-        return False
+    # Check if the target directory exists
+    hsrc = hash_cache_path(hash_cache, file)
+    os.makedirs(os.path.dirname(hsrc), exist_ok=True)
 
-    else:
-        # In this case, we're sure rebuilding needs to happen (since they may be as a result from a dependency)
-        pwarning(f"Cached file '{file}' is not a file or directory (is the sources/results list up-to-date?)")
-        return True
+    # Write the hash to it
+    try:
+        with open(hsrc, "w") as h:
+            h.write(src_hash)
+    except IOError as e:
+        pwarning(f"Failed to write hash cache to '{hsrc}': {e} (compilation will likely always happen until fixed)")
 
 def update_cache(args: argparse.Namespace, file: str, is_src: bool):
     """
@@ -343,34 +539,15 @@ def update_cache(args: argparse.Namespace, file: str, is_src: bool):
 
     # Match the type of the source file
     if os.path.isfile(file):
-        # Attempt to compute the hash
-        try:
-            with open(file, "rb") as h:
-                src_hash = hashlib.md5()
-                while True:
-                    data = h.read(65536)
-                    if not data: break
-                    src_hash.update(h.read())
-        except IOError as e:
-            pwarning(f"Failed to read source file '{file}' to compute hash: {e} (compilation will likely always happen until fixed)")
-            return
-
-        # Check if the target directory exists
-        hsrc = os.path.abspath(hash_cache + f"/{file}")
-        if hsrc[:len(hash_cache)] != hash_cache: raise ValueError(f"Hash source '{hsrc}' is not in the hash cache ({hash_cache}); please do not escape it")
-        os.makedirs(os.path.dirname(hsrc), exist_ok=True)
-
-        # Write the hash to it
-        try:
-            with open(hsrc, "w") as h:
-                h.write(src_hash.hexdigest())
-        except IOError as e:
-            pwarning(f"Failed to write hash cache to '{hsrc}': {e} (compilation will likely always happen until fixed)")
+        # Simply update this one file
+        update_file_cache(hash_cache, file)
 
     elif os.path.isdir(file):
-        # It's a dir; recurse
-        for nested_file in os.listdir(file):
-            update_cache(args, os.path.join(file, nested_file), is_src)
+        # It's a dir; update all of its files in parallel
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            for future in [ pool.submit(update_file_cache, hash_cache, nested_file) for nested_file in walk_files(file) ]:
+                # Propagate any errors
+                future.result()
 
     else:
         # Warn the user
@@ -389,49 +566,31 @@ def flags_changed(args: argparse.Namespace, name: str) -> bool:
     flags_cache = os.path.abspath(args.cache + "/flags")
     fsrc = flags_cache + f"/{name}"
 
-    # If the file does not exist, then we always go on
-    if not os.path.exists(fsrc):
-        pdebug(f"Flags file '{fsrc}' not found; assuming target is outdated")
-        return True
-
-    # Attempt to read the cache file
-    cached: dict[str, typing.Any] = {
-        "dev": None,
-        "down": None,
-    }
-    try:
-        with open(fsrc, "r") as h:
-            # Read line-by-line
-            l = 0
-            for line in h.readlines():
-                l += 1
-
-                # Attempt to split into flag/value pair
-                parts = [p.strip() for p in line.split("=")]
-                if len(parts) != 2:
-                    pwarning(f"Line {l} in flags cache file '{fsrc}' is not a valid flag/value pair (skipping line)")
-                    continue
-                (flag, value) = (parts[0].lower(), parts[1])
-
-                # See if we now this flag
-                if flag not in cached:
-                    pwarning(f"Line {l} in flags cache file '{fsrc}' has unknown flag '{flag}' (ignoring)")
-                    continue
-
-                # Split on the flag to parse further
-                if flag == "dev":
-                    cached["dev"] = value.lower() == "true"
-                elif flag == "down":
-                    cached["down"] = value.lower() == "true"
-
-    except IOError as e:
-        pwarning(f"Could not read flags cache file '{fsrc}': {e} (assuming target is outdated)")
-        return True
+    # Attempt to read the cache file, unless we already did so this run
+    cached = flags_memo.get(fsrc, None)
+    if cached is None:
+        try:
+            with open(fsrc, "r") as h:
+                cached = json.load(h)
+        except FileNotFoundError:
+            pdebug(f"Flags file '{fsrc}' not found; assuming target is outdated")
+            return True
+        except IOError as e:
+            pwarning(f"Could not read flags cache file '{fsrc}': {e} (assuming target is outdated)")
+            return True
+        except json.JSONDecodeError as e:
+            # Flag files written by older versions of this script are in a plain 'flag=value' format; they are simply replaced after the next build
+            pdebug(f"Could not parse flags cache file '{fsrc}' (likely written in the old format): {e}; assuming target is outdated")
+            return True
+        if not isinstance(cached, dict):
+            pwarning(f"Flags cache file '{fsrc}' does not contain a flag/value map (assuming target is outdated)")
+            return True
+        flags_memo[fsrc] = cached
 
     # Now compare
-    for flag in cached:
+    for flag in [ "dev", "down" ]:
         # Make sure we parsed this one
-        if cached[flag] is None:
+        if flag not in cached:
             pwarning(f"Missing flag '{flag}' in flags cache file '{fsrc}' (assuming target is outdated)")
             return True
         # Check if outdated
@@ -461,11 +620,75 @@ def update_flags(args: argparse.Namespace, name: str):
     os.makedirs(os.path.dirname(fsrc), exist_ok=True)
     try:
         with open(fsrc, "w") as h:
-            for (flag, value) in cached.items():
-                h.write(f"{flag}={value}\n")
+            json.dump(cached, h)
+        flags_memo[fsrc] = cached
     except IOError as e:
         pwarning(f"Could not write flags cache file '{fsrc}': {e} (recompilation will occur for this target until fixed)")
 
+def download_changed(args: argparse.Namespace, name: str, addr: str, file: str) -> bool:
+    """
+        Examines if the given file was not downloaded by the given Target from the given address, or if it has changed since.
+
+        The address and the hash of the downloaded file are kept in a small JSON file in the cache, written by update_download().
+    """
+
+    # Get absolute version of the download cache
+    fsrc = os.path.abspath(args.cache + "/downloads") + f"/{name}"
+
+    # Attempt to read the cache file
+    try:
+        with open(fsrc, "r") as h:
+            cached = json.load(h)
+    except FileNotFoundError:
+        pdebug(f"Download file '{fsrc}' not found; assuming target is outdated")
+        return True
+    except IOError as e:
+        pwarning(f"Could not read download cache file '{fsrc}': {e} (assuming target is outdated)")
+        return True
+    except json.JSONDecodeError as e:
+        pwarning(f"Could not parse download cache file '{fsrc}': {e} (assuming target is outdated)")
+        return True
+    if not isinstance(cached, dict) or "address" not in cached or "hash" not in cached:
+        pwarning(f"Download cache file '{fsrc}' does not contain an address and a hash (assuming target is outdated)")
+        return True
+
+    # Compare the address first, since that's cheap
+    if cached["address"] != addr:
+        pdebug(f"Address in download file '{fsrc}' does not match current address; assuming target is outdated")
+        return True
+    # Then make sure the file is still the one we downloaded (e.g., not truncated by a killed download)
+    try:
+        if memoized_hash_file(file) != cached["hash"]:
+            pdebug(f"Hash in download file '{fsrc}' does not match hash of '{file}'; assuming target is outdated")
+            return True
+    except IOError as e:
+        pwarning(f"Could not hash downloaded file '{file}': {e} (assuming target is outdated)")
+        return True
+
+    # No outdating occurred
+    return False
+
+def update_download(args: argparse.Namespace, name: str, addr: str, file: str):
+    """
+        Updates the download cache for the given Target to the given address and the current state of the given file.
+    """
+
+    # Get absolute version of the download cache
+    fsrc = os.path.abspath(args.cache + "/downloads") + f"/{name}"
+
+    # Write it
+    os.makedirs(os.path.dirname(fsrc), exist_ok=True)
+    try:
+        cached = {
+            "address": addr,
+            "hash": memoized_hash_file(file),
+        }
+        with open(fsrc, "w") as h:
+            json.dump(cached, h)
+    except IOError as e:
+        pwarning(f"Could not write download cache file '{fsrc}': {e} (the file will be downloaded again until fixed)")
+
+@functools.lru_cache(maxsize=None)
 def deduce_toml_src_dirs(toml: str) -> list[str] | None:
     """
         Given a Cargo.toml file, attempts to deduce the (local) source crates.
@@ -484,14 +707,22 @@ def deduce_toml_src_dirs(toml: str) -> list[str] | None:
             text = h.read()
 
             # Parse
-            parser = CargoTomlParser(text)
-            (res, errs) = parser.parse()
-            if len(errs) > 0:
-                for err in errs:
-                    perror(f"{err}")
+            if tomllib is None:
+                cancel("Parsing Cargo.toml files requires Python 3.11 or newer, or the 'tomli' package")
+            try:
+                data = tomllib.loads(text)
+            except tomllib.TOMLDecodeError as e:
+                perror(f"{e}")
                 return None
-            
-            # Else, resolve the given paths
+
+            # Extract the paths of any local (build) dependencies
+            res = []
+            for section in [ "dependencies", "build-dependencies" ]:
+                for dependency in data.get(section, {}).values():
+                    if isinstance(dependency, dict) and "path" in dependency:
+                        res.append(dependency["path"])
+
+            # Resolve the given paths
             for i in range(len(res)):
                 res[i] = os.path.join(os.path.dirname(toml), res[i])
             # Add the cargo path
@@ -506,1178 +737,400 @@ def deduce_toml_src_dirs(toml: str) -> list[str] | None:
     except IOError as e:
         cancel(f"Could not read given Cargo.toml '{toml}': {e}")
 
-def get_image_digest(path: str) -> str:
+@functools.lru_cache(maxsize=None)
+def probe_executable(exe: str) -> str | None:
     """
-        Given a Docker image .tar file, attempts to read the digest and return it.
-    """
-
-    # Open the tar file
-    archive = tarfile.open(path)
-
-    # Find the manifest file
-    digest = None
-    for file in archive.getmembers():
-        # Skip if not the proper file
-        if not file.isfile() or file.name != "manifest.json": continue
-
-        # Attempt to read it
-        f = archive.extractfile(file)
-        if f is None:
-            cancel(f"Failed to extract archive member '{file}' in '{path}'.")
-        smanifest = f.read().decode("utf-8")
-        f.close()
+        Checks if the given executable can be run by calling it with '--version'.
 
-        # Read as json
-        manifest = json.loads(smanifest)
-
-        # Extract the config blob (minus prefix)
-        config = manifest[0]["Config"]
-        if config[:13] != "blobs/sha256/": cancel("Found Config in manifest.json, but blob had incorrect start (corrupted image .tar?)")
-        config = config[13:]
-
-        # Done
-        digest = config
-
-    # Throw a failure
-    if digest is None:
-        cancel(f"Did not find image digest in {path} (is it a valid Docker image file?)")
-
-    # Done
-    archive.close()
-    return digest
-
-
-
-##### HELPER CLASSES #####
-class ProgressBar:
-    """
-        Class that shows a simply progress bar on the CLI.
+        Returns None if it can, or else a description of why not. The result
+        is cached, since the answer won't change during a single run.
     """
 
-    _width     : int
-    _i         : int
-    _max       : int
-    _prefix    : str
-    _draw_time : float
-    _last_draw : float
-
-
-    def __init__(self, start: int=0, stop: int=99, prefix: str="", width: int | None = None, draw_time: float=0.5) -> None:
-        """
-            Constructor for the ProgressBar class.
-
-            Arguments:
-            - `start`: The start value of the progressbar (before calling update() or set()).
-            - `stop`: The end value. As soon as update() or set() pushes the value equal to (or above) this one, the progress bar will reach 100%.
-            - `prefix`: Some extra text to preview at the start of the bar.
-            - `width`: The width (in characters) or the progress bar. If 'None', tries to deduce it automatically (using ).
-            - `draw_time`: The time (in seconds) between two draw calls.
-        """
-
-        # Deduce the wdith
-        if width is None:
-            if hasattr(sys.stdout, 'isatty') and sys.stdout.isatty():
-                width = os.get_terminal_size().columns
-            else:
-                width = 80
-
-        # Set the values
-        self._width     = width
-        self._i         = start
-        self._max       = stop
-        self._prefix    = prefix
-        self._last_bin  = -10
-        self._draw_time = draw_time
-        self._last_draw = 0
-
-
-
-    def should_draw(self) -> bool:
-        """
-            Returns whether the ProgressBar's default timeout has passed.
-        """
-
-        return time.time() - self._last_draw > self._draw_time
-
-
-
-    def draw(self) -> None:
-        """
-            Re-draws the progress bar by going to the start of the line (using '\r') and drawing it.
-
-            Any potential 'draw timing' (i.e., only updating the terminal every half a second or so) should be done when calling this function.
-        """
-
-        # Switch on whether the terminal is a tty
-        if hasattr(sys.stdout, 'isatty') and sys.stdout.isatty():
-            # Compute the non-prefix width
-            width = self._width - len(self._prefix)
-
-            # Write the prefix first
-            print(f"\r{self._prefix}", end="")
-
-            # Write the start of the bar
-            if width < 1: return
-            print(f"[", end="")
-
-            # Now write the bar itself to a string of the appropriate height
-            if width > 2:
-                bar_end = int((self._i / self._max) * (width - 2)) if self._i < self._max else (width - 2)
-                bar = "=" * bar_end + " " * ((width - 2) - bar_end)
-
-                # Overwrite the middle part with the progress percentage
-                percentage = self._i / self._max * 100
-                spercentage = f"{percentage:.1f}%"
-                if len(bar) >= len(spercentage):
-                    percentage_start = (len(bar) // 2) - (len(spercentage) // 2)
-                    bar = bar[:percentage_start] + spercentage + bar[percentage_start + len(spercentage):]
-                print(bar, end="")
-
-            # Write the end thingy
-            if width < 2: return
-            print(f"]", end="")
-        else:
-            # Simply write the progress bin we just reached
-            percentage = self._i / self._max * 100
-            if percentage - self._last_bin >= 10:
-                self._last_bin += 10
-                print(f"{self._prefix if self._last_bin < 0 else ''}{self._last_bin}{'...' if self._last_bin < 100 else ''}", end="")
-
-        # Don't forget to flush stdout
-        sys.stdout.flush()
-
-    def update(self, step=1, force_draw=False) -> None:
-        """
-            Updates the progress bar with the given number of steps (i.e., relative update).
-
-            If `force_draw` is False, only redraws every half second. Otherwise, always draws when update() is called.
-        """
-
-        # Update the value
-        self._i += step
-        if self._i < 0: self._i = 0
-        if self._i > self._max: self._i = self._max
-
-        # Redraw if necessary
-        if force_draw or self.should_draw():
-            self.draw()
-            self._last_draw = time.time()
-
-    def update_to(self, i, force_draw=False) -> None:
-        """
-            Sets the progress bar to the given amount of value (i.e., absolute update).
-
-            If `force_draw` is False, only redraws every half second. Otherwise, always draws when update() is called.
-        """
-
-        # Update the value
-        self._i = i
-        if self._i < 0: self._i = 0
-        if self._i > self._max: self._i = self._max
-
-        # Redraw if necessary
-        if force_draw or self.should_draw():
-            self.draw()
-            self._last_draw = time.time()
-
-    def stop(self) -> None:
-        """
-            Stops the progress bar by writing a newline.
-
-            Always draws, then stops drawing forever.
-        """
-
-        self._i = self._max
-        self.draw()
-        self._last_draw = sys.maxsize * 2 + 1
-        print()
-
-
-
-    def update_prefix(self, prefix) -> None:
-        """
-            Changes the prefix before the progress bar.
-        """
-
-        self._prefix = prefix
+    try:
+        res = subprocess.run([ exe, "--version" ], text=True, stdin=subprocess.DEVNULL, capture_output=True, check=False)
+    except OSError as e:
+        return f"{e}"
+    if res.returncode != 0:
+        return res.stderr
+    return None
 
-class CargoTomlParser:
+def ensure_dir(path: str) -> int:
     """
-        Parses a given file as if it were a Cargo.toml file.
+        Creates the given directory (and its parents) if it doesn't exist yet.
 
-        This is definitely not a TOML compliant-parser, though, not least of
-        which because it only extracts stuff under the 'dependencies' toplevel
-        section.
+        Directories are only created once per run, no matter how many Targets
+        write to them. Returns 0, so it can be used as a PseudoCommand callback.
     """
 
+    if path not in created_dirs:
+        os.makedirs(path, exist_ok=True)
+        created_dirs.add(path)
+    return 0
 
-    # Baseclasses
-    class Symbol(abc.ABC):
-        """
-            Baseclass for all the symbols.
-        """
-
-        is_term : bool
-        start   : tuple[int, int]
-        end     : tuple[int, int]
-
-
-        def __init__(self, is_term: bool, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the Symbol.
-
-                # Arguments
-                - `is_term`: Whether this Symbol is a terminal or not (it's a nonterminal).
-                - `start`: The (inclusive) start position of this symbol in the text.
-                - `stop`: The (inclusive) stop position of this symbol in the text.
-            """
-
-            self.is_term = is_term
-            self.start   = start
-            self.end     = end
-
-        def __str__(self) -> str:
-            return "Symbol"
-
-    class Terminal(Symbol):
-        """
-            Baseclass for all the parser tokens.
-        """
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the Terminal.
-
-                # Arguments
-                - `start`: The (inclusive) start position of this symbol in the text.
-                - `end`: The (inclusive) stop position of this symbol in the text.
-            """
-
-            CargoTomlParser.Symbol.__init__(self, True, start, end)
-
-        def __str__(self) -> str:
-            return "Terminal"
-
-    class Nonterminal(Symbol):
-        """
-            Baseclass for all the parser nonterminals.
-        """
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the Nonterminal.
-
-                # Arguments
-                - `start`: The (inclusive) start position of this symbol in the text.
-                - `end`: The (inclusive) stop position of this symbol in the text.
-            """
-
-            CargoTomlParser.Symbol.__init__(self, False, start, end)
-
-        def __str__(self) -> str:
-            return "NonTerminal"
-
-
-    # Terminals
-    class Identifier(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a string token.
-        """
-
-        value : str
-
-
-        def __init__(self, value: str, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the String
-
-                Arguments
-                - `value`: The value of the String.
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-            self.value = value
-
-        def __str__(self) -> str:
-            return f"Identifier({self.value})"
-
-    class String(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a string value.
-        """
-
-        value : str
-
-
-        def __init__(self, value: str, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the String
-
-                Arguments
-                - `value`: The value of the String.
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-            self.value = value
-
-        def __str__(self) -> str:
-            return f"String({self.value})"
-
-    class Boolean(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a boolean value.
-        """
-
-        value : bool
-
-
-        def __init__(self, value: bool, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the Boolean
-
-                Arguments
-                - `value`: The value of the Boolean.
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-            self.value = value
-
-        def __str__(self) -> str:
-            return f"Boolean({self.value})"
-
-    class Equals(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents an equals sign.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the Equals
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "Equals"
-
-    class Comma(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a comma.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the Comma
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "Comma"
-
-    class LCurly(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a left curly bracket.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the LCurly
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "LCurly"
-
-    class RCurly(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a right curly bracket.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the RCurly
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "RCurly"
-
-    class LSquare(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a left square bracket.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the LSquare
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "LSquare"
-
-    class RSquare(Terminal):
-        """
-            Helper class for the CargoTomlParser which represents a right square bracket.
-        """
-
-
-        def __init__(self, start: tuple[int, int], end: tuple[int, int]) -> None:
-            """
-                Constructor for the RSquare
-
-                Arguments
-                - `start`: The start position (as (row, col), inclusive) of the token.
-                - `end`: The end position (as (row, col), inclusive) of the token.
-            """
-
-            CargoTomlParser.Terminal.__init__(self, start, end)
-
-        def __str__(self) -> str:
-            return "RSquare"
-
+def get_image_digest(path: str) -> str:
+    """
+        Given a Docker image .tar file, attempts to read the digest and return it.
+    """
 
-    # Nonterminals
-    class Section(Nonterminal):
-        """
-            Represents a section in the TOML file.
-        """
+    # Only import tarfile when we actually need it, since most runs don't
+    import tarfile
 
-        header : CargoTomlParser.SectionHeader
-        pairs  : list[CargoTomlParser.KeyValuePair]
+    # Open the tar file
+    digest = None
+    with tarfile.open(path) as archive:
+        # Find the manifest file, walking the members lazily so we can stop as soon as we find it
+        for file in archive:
+            # Skip if not the proper file
+            if not file.isfile() or file.name != "manifest.json": continue
+
+            # Attempt to read it
+            f = archive.extractfile(file)
+            if f is None:
+                cancel(f"Failed to extract archive member '{file}' in '{path}'.")
+            with f:
+                manifest = json.load(f)
+
+            # Extract the config blob (minus prefix); newer Docker versions store it as an OCI blob, older ones (and skopeo) as '<digest>.json'
+            config = manifest[0]["Config"]
+            if config.startswith("blobs/sha256/"):
+                digest = config[13:]
+            elif config.endswith(".json") and "/" not in config:
+                digest = config[:-5]
+            else:
+                cancel("Found Config in manifest.json, but blob had incorrect start (corrupted image .tar?)")
+            break
 
+    # Throw a failure
+    if digest is None:
+        cancel(f"Did not find image digest in {path} (is it a valid Docker image file?)")
 
-        def __init__(self, header: CargoTomlParser.SectionHeader, pairs: list[CargoTomlParser.KeyValuePair], start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
+    # Done
+    return digest
 
-                # Arguments
-                - `header`: The header of the section.
-                - `pairs`: The key/value pairs in this section.
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
+def smooth_rate(rate: float | None, sample: float) -> float:
+    """
+        Folds the given sample into the given exponential moving average of a download rate.
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
+        If the average is None, then there were no samples yet and the given one is returned as-is.
+    """
 
-            self.header = header
-            self.pairs  = pairs
+    if rate is None: return sample
+    return DOWNLOAD_RATE_SMOOTHING * sample + (1 - DOWNLOAD_RATE_SMOOTHING) * rate
 
-        def __str__(self) -> str:
-            return f"Section({self.header}, ...)"
+def http_get(url: str, headers: dict[str, str] = {}) -> tuple[str, http.client.HTTPResponse]:
+    """
+        Sends a GET-request to the given URL, following any redirects.
 
-    class SectionHeader(Nonterminal):
-        """
-            Represents a section header.
-        """
+        Every thread keeps its connection to each host open between requests,
+        so downloading multiple files (or ranges) from the same server only
+        pays for the TCP- and TLS-handshakes once. This only works if the
+        previous response on that connection was read completely; otherwise,
+        a new connection is opened.
 
-        name : str
+        Requests to hosts that must be reached through a proxy (according to
+        the usual 'HTTP(S)_PROXY' and 'NO_PROXY' environment variables) are
+        left to urllib instead, which knows how to talk to them.
 
-        def __init__(self, name: str, start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
+        Returns the final URL (after redirection) and the response. Raises an
+        IOError if the request could not be sent.
+    """
 
-                # Arguments
-                - `name`: The name of the section.
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
+    # Only import the URL machinery when we actually download something, since most runs don't
+    import urllib.parse
+    import urllib.request
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
+    # Get this thread's connections
+    conns = getattr(http_connections, "conns", None)
+    if conns is None:
+        conns = {}
+        http_connections.conns = conns
 
-            self.name = name
+    proxies = urllib.request.getproxies()
+    for _ in range(HTTP_MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        path  = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key   = (parts.scheme, parts.netloc)
 
-        def __str__(self) -> str:
-            return f"SectionHeader({self.name})"
+        # Leave proxied requests (and any redirects they incur) to urllib
+        if parts.scheme in proxies and not urllib.request.proxy_bypass(parts.netloc):
+            res = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+            return (res.url, res)
 
-    class KeyValuePair(Nonterminal):
-        """
-            Represents a Key/Value pair in the stack.
-        """
+        # Re-use the connection to this host if the last response on it was read completely (and the server will keep it open)
+        (conn, last) = conns.get(key, (None, None))
+        fresh = conn is None or last is None or not last.isclosed() or last.length != 0 or last.will_close
+        if fresh:
+            if conn is not None: conn.close()
+            if parts.scheme == "https":
+                conn = http.client.HTTPSConnection(parts.netloc)
+            elif parts.scheme == "http":
+                conn = http.client.HTTPConnection(parts.netloc)
+            else:
+                raise IOError(f"unsupported URL scheme '{parts.scheme}' in '{url}'")
+        conn = typing.cast(http.client.HTTPConnection, conn)
 
-        key   : CargoTomlParser.Identifier
-        value : CargoTomlParser.Value
+        # Send the request; if the server dropped a connection we kept open, try again once on a new one
+        try:
+            conn.request("GET", path, headers=headers)
+            res = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if fresh: raise
+            conn.request("GET", path, headers=headers)
+            res = conn.getresponse()
+        conns[key] = (conn, res)
+
+        # Follow redirects (reading their bodies, so the connection can be re-used)
+        if res.status in (301, 302, 303, 307, 308) and "Location" in res.headers:
+            res.read()
+            url = urllib.parse.urljoin(url, res.headers["Location"])
+            continue
+        return (url, res)
+    raise IOError(f"too many redirects (more than {HTTP_MAX_REDIRECTS})")
+
+def download_ranges(url: str, h: typing.BinaryIO, size: int, prgs: ProgressBar) -> None:
+    """
+        Downloads the file at the given URL to the given (binary) handle by
+        fetching chunks of it as byte ranges in parallel.
+
+        The server must support range requests, and `size` must be the full
+        size of the file. Raises an IOError if any of the ranges could not be
+        downloaded.
+    """
+
+    # Reserve the full size of the file so every range can be written at its own offset
+    h.truncate(size)
+    fd = h.fileno()
+
+    # Define the function that downloads a single range
+    lock      = threading.Lock()
+    failed    = threading.Event()
+    last_time = time.monotonic()
+    last_done = 0
+    done      = 0
+    rate      = None
+    def fetch_range(offset: int) -> None:
+        nonlocal last_time, last_done, done, rate
+
+        # Request the range
+        end = min(offset + DOWNLOAD_CHUNK_SIZE, size) - 1
+        (_, res) = http_get(url, headers={ "Range": f"bytes={offset}-{end}" })
+        with res:
+            if res.status != 206:
+                raise IOError(f"server returned exit code {res.status} ({res.reason}) for range {offset}-{end} instead of partial content")
+
+            # Write the chunks as they come in
+            chunk = res.read(DOWNLOAD_BLOCK_SIZE)
+            while len(chunk) > 0:
+                # Stop early if another range failed or the build was interrupted
+                if failed.is_set(): return
+                if build_cancelled.is_set(): raise KeyboardInterrupt()
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+
+                # Update the progressbar (shared between all threads)
+                with lock:
+                    done += len(chunk)
+                    now   = time.monotonic()
+                    if now - last_time >= DOWNLOAD_SAMPLE_INTERVAL:
+                        # Only recompute the shown rate every so often, so it doesn't jump around with every chunk
+                        rate = smooth_rate(rate, (done - last_done) / (now - last_time))
+                        prgs.update_prefix(f"   {to_bytes(int(rate)).rjust(10)}/s ")
+                        (last_time, last_done) = (now, done)
+                    prgs.update(len(chunk))
+
+                # Fetch the next chunk
+                chunk = res.read(DOWNLOAD_BLOCK_SIZE)
+        if offset != end + 1:
+            raise IOError(f"range ending at {end} was cut short at {offset}")
+
+    # Fetch all ranges, cancelling the remainder as soon as one fails (or we are interrupted)
+    pool = concurrent.futures.ThreadPoolExecutor(DOWNLOAD_WORKERS)
+    try:
+        for future in [ pool.submit(fetch_range, offset) for offset in range(0, size, DOWNLOAD_CHUNK_SIZE) ]:
+            future.result()
+    except BaseException:
+        # Don't wait for the ranges that are still in flight to complete
+        failed.set()
+        raise
+    finally:
+        pool.shutdown(cancel_futures=True)
 
 
-        def __init__(self, key: CargoTomlParser.Identifier, value: CargoTomlParser.Value, start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
 
-                # Arguments
-                - `key`: The key of the pair (which is an Identifier).
-                - `value`: The value of the pair (which is a Value).
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
+##### HELPER CLASSES #####
+class ProgressBar:
+    """
+        Class that shows a simply progress bar on the CLI.
+    """
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
+    __slots__ = ( "_width", "_i", "_max", "_prefix", "_last_bin", "_draw_time", "_last_draw", "_last_bar", "_bar_full", "_bar_empty" )
 
-            self.key   = key
-            self.value = value
+    _width     : int
+    _i         : int
+    _max       : int
+    _prefix    : str
+    _last_bin  : int
+    _draw_time : float
+    _last_draw : float
+    _last_bar  : tuple[str, int, str] | None
+    _bar_full  : str
+    _bar_empty : str
 
-        def __str__(self) -> str:
-            return f"KeyValuePair({self.key}, {self.value})"
 
-    class Value(Nonterminal):
-        """
-            Abstracts away over the specific value.
+    def __init__(self, start: int=0, stop: int=99, prefix: str="", width: int | None = None, draw_time: float=0.5) -> None:
         """
+            Constructor for the ProgressBar class.
 
-        value : CargoTomlParser.String | CargoTomlParser.Boolean | CargoTomlParser.List | CargoTomlParser.Dict
-
-        def __init__(self, value: CargoTomlParser.String | CargoTomlParser.Boolean | CargoTomlParser.List | CargoTomlParser.Dict, start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
+            Arguments:
+            - `start`: The start value of the progressbar (before calling update() or set()).
+            - `stop`: The end value. As soon as update() or set() pushes the value equal to (or above) this one, the progress bar will reach 100%.
+            - `prefix`: Some extra text to preview at the start of the bar.
+            - `width`: The width (in characters) or the progress bar. If 'None', tries to deduce it automatically (using ).
+            - `draw_time`: The time (in seconds) between two draw calls.
+        """
 
-                # Arguments
-                - `value`: The value of the Value.
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
+        # Deduce the wdith
+        if width is None:
+            if stdout_is_tty():
+                width = os.get_terminal_size().columns
+            else:
+                width = 80
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
+        # Set the values
+        self._width     = width
+        self._i         = start
+        self._max       = stop
+        self._prefix    = prefix
+        self._last_bin  = -10
+        self._draw_time = draw_time
+        self._last_draw = -draw_time
+        self._last_bar  = None
+        self._bar_full  = ""
+        self._bar_empty = ""
 
-            self.value = value
 
-        def __str__(self) -> str:
-            return f"Value({self.value})"
 
-    class Dict(Nonterminal):
+    def should_draw(self) -> bool:
         """
-            Represents a dictionary of key/value pairs.
+            Returns whether the ProgressBar's default timeout has passed.
         """
 
-        pairs : list[CargoTomlParser.KeyValuePair]
-
+        return time.monotonic() - self._last_draw > self._draw_time
 
-        def __init__(self, pairs: list[CargoTomlParser.KeyValuePair], start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
 
-                # Arguments
-                - `pairs`: The list of KeyValuePairs in this dictionary.
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
-
-            self.pairs = pairs
+    def draw(self) -> None:
+        """
+            Re-draws the progress bar by going to the start of the line (using '\r') and drawing it.
 
-        def __str__(self) -> str:
-            res = "Dict({\n"
-            for p in self.pairs:
-                res += f"    {p},\n"
-            return res + "})"
+            Any potential 'draw timing' (i.e., only updating the terminal every half a second or so) should be done when calling this function.
 
-    class List(Nonterminal):
-        """
-            Represents a list of values.
+            Does nothing while multiple Targets are built at the same time (see 'live_progress').
         """
 
-        values : list[CargoTomlParser.Value]
+        if not live_progress: return
 
+        # Switch on whether the terminal is a tty
+        if stdout_is_tty():
+            # Compute the non-prefix width
+            width = self._width - len(self._prefix)
 
-        def __init__(self, values: list[CargoTomlParser.Value], start: tuple[int, int], end: tuple[int, int]):
-            """
-                Constructor for the SectionHeader nonterminal.
-
-                # Arguments
-                - `values`: The list of Values in this list.
-                - `start`: The (inclusive) start position of this token.
-                - `end`: The (inclusive) end position of this token.
-            """
+            # Skip drawing altogether if the bar would look exactly the same as last time
+            bar_end = int((self._i / self._max) * (width - 2)) if self._i < self._max else (width - 2)
+            spercentage = f"{self._i / self._max * 100:.1f}%"
+            if (self._prefix, bar_end, spercentage) == self._last_bar: return
+            self._last_bar = (self._prefix, bar_end, spercentage)
 
-            CargoTomlParser.Nonterminal.__init__(self, start, end)
+            # Write the prefix first
+            print(f"\r{self._prefix}", end="")
 
-            self.values = values
+            # Write the start of the bar
+            if width < 1: return
+            print(f"[", end="")
 
-        def __str__(self) -> str:
-            res = "List(["
-            for i, v in enumerate(self.values):
-                if i > 0: res += ", "
-                res += f"{v}"
-            return res + "])"
+            # Now write the bar itself to a string of the appropriate height
+            if width > 2:
+                # Only rebuild the full & empty bars if the width changed (e.g., because of a new prefix)
+                if len(self._bar_full) != width - 2:
+                    self._bar_full  = "=" * (width - 2)
+                    self._bar_empty = " " * (width - 2)
+                bar = self._bar_full[:bar_end] + self._bar_empty[bar_end:]
 
+                # Overwrite the middle part with the progress percentage
+                if len(bar) >= len(spercentage):
+                    percentage_start = (len(bar) // 2) - (len(spercentage) // 2)
+                    bar = bar[:percentage_start] + spercentage + bar[percentage_start + len(spercentage):]
+                print(bar, end="")
 
+            # Write the end thingy
+            if width < 2: return
+            print(f"]", end="")
+        else:
+            # Simply write the progress bin we just reached
+            percentage = self._i / self._max * 100
+            if percentage - self._last_bin >= 10:
+                self._last_bin += 10
+                print(f"{self._prefix if self._last_bin < 0 else ''}{self._last_bin}{'...' if self._last_bin < 100 else ''}", end="")
 
-    _lines : list[str]
-    _col   : int
-    _line  : int
+        # Don't forget to flush stdout
+        sys.stdout.flush()
 
+    def update(self, step=1, force_draw=False) -> None:
+        """
+            Updates the progress bar with the given number of steps (i.e., relative update).
 
-    def __init__(self, raw: str) -> None:
+            If `force_draw` is False, only redraws every half second. Otherwise, always draws when update() is called.
         """
-            Constructor for the CargoTomlParser.
 
-            Arguments:
-            - `raw`: The raw text to parse as a Cargo.toml file.
-        """
-
-        # Initialize stuff
-        self._lines = raw.split('\n')
-        self._col   = 0
-        self._line  = 0
-
-    def _token(self) -> Terminal | Exception | None:
-        """
-            Consumes the next token from the internal text.
-
-            If the returned value derived from an Exception, then the text is
-            invalid TOML.
-            If the returned value is None, then no more tokens are available.
-        """
-
-        start = (0, 0)
-        buffer = ""
-        mode = "start"
-        while self._line < len(self._lines):
-            if self._col >= len(self._lines[self._line]):
-                # Update the values
-                self._col = 0
-                self._line += 1
-
-                # Throw errors where it matters
-                if mode == "identifier":
-                    return CargoTomlParser.Identifier(buffer, start, (self._line - 1, len(self._lines[self._line - 1]) - 1))
-                elif mode == "section":
-                    return ValueError(f"{self._line}:{self._col}: Encountered unterminated section header (missing ']')")
-                elif mode == "string":
-                    return ValueError(f"{self._line}:{self._col}: Encountered unterminated string (missing '\"')")
-                elif mode == "string_escape":
-                    return ValueError(f"{self._line}:{self._col}: Missing escape character")
-                elif mode == "comment":
-                    # Go back to start mode
-                    mode = "start"
-            if self._line >= len(self._lines):
-                break
-            if self._col  >= len(self._lines[self._line]):
-                continue
-            c = self._lines[self._line][self._col]
-            # print(f"\n >>> [{mode}] CHAR {self._line}:{self._col}: '{c}'")
-
-            # Switch on the mode
-            if mode == "start":
-                start = (self._line, self._col)
-
-                # Switch on the character
-                if (ord(c) >= ord('a') and ord(c) <= ord('z')) or (ord(c) >= ord('A') and ord(c) <= ord('Z')) or c == '_':
-                    # Switch to parsing an identifier token
-                    mode = "identifier"
-                    buffer += c
-                    self._col += 1
-                    continue
-                elif c == '\'' or c == '"':
-                    # Switch to parsing as string literal
-                    mode = "string"
-                    self._col += 1
-                    continue
-                elif c == '=':
-                    # Just parse as an equals-sign
-                    self._col += 1
-                    return CargoTomlParser.Equals(start, start)
-                elif c == ',':
-                    # Just parse as a comma
-                    self._col += 1
-                    return CargoTomlParser.Comma(start, start)
-                elif c == '{':
-                    # Return the character as a token
-                    self._col += 1
-                    return CargoTomlParser.LCurly(start, start)
-                elif c == '}':
-                    # Return the character as a token
-                    self._col += 1
-                    return CargoTomlParser.RCurly(start, start)
-                elif c == '[':
-                    # Simply return the LBracket
-                    self._col += 1
-                    return CargoTomlParser.LSquare(start, start)
-                elif c == ']':
-                    # Simply return the RBracket
-                    self._col += 1
-                    return CargoTomlParser.RSquare(start, start)
-                elif c == ' ' or c == '\t' or c == '\r':
-                    # Skip
-                    self._col += 1
-                    continue
-                elif c == '#':
-                    # Comment
-                    mode = "comment"
-                    self._col += 1
-                    continue
-                else:
-                    self._col += 1
-                    return ValueError(f"{start[0]}:{start[1]}: Unexpected character '{c}'")
-
-            elif mode == "identifier":
-                # Switch on the character
-                if (ord(c) >= ord('a') and ord(c) <= ord('z')) or \
-                   (ord(c) >= ord('A') and ord(c) <= ord('Z')) or \
-                   (ord(c) >= ord('0') and ord(c) <= ord('9')) or \
-                    c == '-' or c == '_':
-                    # Keep parsing
-                    buffer += c
-                    self._col += 1
-                    continue
-                else:
-                    # Done parsing; let start handle this char
-
-                    # If keyword, intercept that
-                    if buffer == "true" or buffer == "false":
-                        # It's a boolean instead
-                        return CargoTomlParser.Boolean(buffer == "true", start, (self._line, self._col - 1))
-
-                    # Otherwise, identifier
-                    return CargoTomlParser.Identifier(buffer, start, (self._line, self._col - 1))
-
-            elif mode == "string":
-                # Switch on the character
-                if c == '\\':
-                    # Parse as escaped string
-                    mode = "string_escape"
-                    self._col += 1
-                    continue
-                elif c == '"':
-                    # We're done!
-                    self._col += 1
-                    return CargoTomlParser.String(buffer, start, (self._line, self._col - 1))
-                else:
-                    # Parse as part of the token
-                    buffer += c
-                    self._col += 1
-                    continue
-
-            elif mode == "string_escape":
-                # Switch on the character
-                if c == '\\' or c == '"' or c == '\'':
-                    buffer += c
-                    mode = "string"
-                    self._col += 1
-                    continue
-                elif c == 'n':
-                    buffer += '\n'
-                    mode = "string"
-                    self._col += 1
-                    continue
-                elif c == 't':
-                    buffer += '\t'
-                    mode = "string"
-                    self._col += 1
-                    continue
-                elif c == 'r':
-                    buffer += '\r'
-                    mode = "string"
-                    self._col += 1
-                    continue
-                else:
-                    # Ignore
-                    perror(f"{self._line}:{self._col}: Unknown escape character '{c}' (ignoring)")
-                    mode = "string"
-                    self._col += 1
-                    continue
-
-            elif mode == "comment":
-                # Do nothing
-                self._col += 1
-                continue
+        # Update the value
+        self._i += step
+        if self._i < 0: self._i = 0
+        if self._i > self._max: self._i = self._max
 
-            else:
-                raise ValueError(f"Unknown mode '{mode}'; this should never happen!")
-        return None
+        # Redraw if necessary
+        if force_draw or self.should_draw():
+            self.draw()
+            self._last_draw = time.monotonic()
 
-    def _reduce(self, stack: list[Symbol]) -> tuple[list[Symbol], str | None | Exception]:
-        """
-            Attempts to apply one of the reduction rules to the current stack of tokens.
-
-            Upon success, returns some string that identifies the rule applied.
-            If no rule has been applied, returns None.
-            Upon failure, returns an Exception.
-        """
-
-        # Start at the end, go backwards to identify the rules
-        mode = "start"
-        i = len(stack) - 1
-        list_values = []
-        while i >= 0:
-            # Get the current symbol
-            s = stack[i]
-
-            # Match the mode
-            if mode == "start":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.RSquare:
-                        # Might be a section header or a list!
-                        mode = "rsquare"
-                        i -= 1
-                        continue
-
-                    elif type(s) == CargoTomlParser.RCurly:
-                        # Might be a dict!
-                        mode = "dict"
-                        i -= 1
-                        continue
-
-                    elif type(s) == CargoTomlParser.String:
-                        # Immediately cast to a value
-                        return (stack[:i] + [ CargoTomlParser.Value(s, s.start, s.end) ], "value_string")
-
-                    elif type(s) == CargoTomlParser.Boolean:
-                        # Immediately cast to a value
-                        return (stack[:i] + [ CargoTomlParser.Value(s, s.start, s.end) ], "value_boolean")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-                else:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.SectionHeader:
-                        # Cast to a Section
-                        return (stack[:i] + [ CargoTomlParser.Section(s, [], s.start, s.end) ], "section_header")
-
-                    elif type(s) == CargoTomlParser.KeyValuePair:
-                        # See if it is preceded by a Section
-                        mode = "key_value_pair"
-                        i -= 1
-                        continue
-
-                    elif type(s) == CargoTomlParser.Value:
-                        # Might be a key/value pair
-                        mode = "value"
-                        i -= 1
-                        continue
-
-                    elif type(s) == CargoTomlParser.List:
-                        # Cast to a value
-                        return (stack[:i] + [ CargoTomlParser.Value(s, s.start, s.end) ], "value_list")
-
-                    elif type(s) == CargoTomlParser.Dict:
-                        # Cast to a value
-                        return (stack[:i] + [ CargoTomlParser.Value(s, s.start, s.end) ], "value_dict")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-            elif mode == "key_value_pair":
-                # Switch between token or not
-                if s.is_term:
-                    # Ignore
-                    return (stack, None)
-
-                else:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Section:
-                        # Append to the section
-                        s.pairs.append(typing.cast(CargoTomlParser.KeyValuePair, stack[i + 1]))
-                        s.end = stack[i + 1].end
-                        return (stack[:i + 1], "section_append")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-            elif mode == "rsquare":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Identifier:
-                        # Yes, on the road to section header!
-                        mode = "rsquare_ident"
-                        i -= 1
-                        continue
-
-                    elif type(s) == CargoTomlParser.LSquare:
-                        # Empty list, we can only assume
-                        new_l = CargoTomlParser.List([], stack[i].start, stack[i + 1].end)
-                        return (stack[:i] + [ new_l ], "empty-list")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-                else:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Value:
-                        # It must be the start of a list
-                        mode = "list"
-                        continue
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-            elif mode == "rsquare_ident":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.LSquare:
-                        # Whohoo, replace them in the stack (reduce)
-                        new_sh = CargoTomlParser.SectionHeader(typing.cast(CargoTomlParser.String, stack[i + 1]).value, stack[i + 2].start, stack[i].end)
-                        return (stack[:i] + [ new_sh ], "section-header")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-                else:
-                    # No rule (yet)
-                    return (stack, None)
-
-            elif mode == "dict":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.LCurly:
-                        # It's an empty dict
-                        new_d = CargoTomlParser.Dict([], stack[i].start, stack[i + 1].end)
-                        return (stack[:i] + [ new_d ], "empty-dict")
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid dict entry: expected a key/value pair, got {s}"))
-
-                else:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.KeyValuePair:
-                        # It's a key/value pair; start parsing it as such
-                        list_values.append(s)
-                        mode = "dict_pair"
-                        i -= 1
-                        continue
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid dict entry: expected a key/value pair, got {s}"))
-
-            elif mode == "dict_pair":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.LCurly:
-                        # End of the list
-                        list_values.reverse()
-                        new_d = CargoTomlParser.Dict(list_values, stack[i].start, stack[len(stack) - 1].end)
-                        return (stack[:i] + [ new_d ], "dict")
-
-                    elif type(s) == CargoTomlParser.Comma:
-                        # The list continious
-                        mode = "dict"
-                        i -= 1
-                        continue
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid dict: expected ',' or '{{', got {s}"))
-
-                else:
-                    # We don't accept any nonterminals at this stage
-                    return (stack[:i], ValueError(f"Invalid list: expected ',' or '[', got {s}"))
-
-            elif mode == "list":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if len(list_values) == 0 and type(s) == CargoTomlParser.LSquare:
-                        # End of the list, but it is empty
-                        new_l = CargoTomlParser.List([], stack[i].start, stack[i + 1].end)
-                        return (stack[:i] + [ new_l ], "empty-list")
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid list entry: expected a Value, got {s}"))
-
-                else:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Value:
-                        # Yes, keep parsing
-                        list_values.append(typing.cast(CargoTomlParser.KeyValuePair, s))
-                        mode = "list_value"
-                        i -= 1
-                        continue
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid list entry: expected a Value, got {s}"))
-
-            elif mode == "list_value":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.LSquare:
-                        # End of the list
-                        list_values.reverse()
-                        new_l = CargoTomlParser.List(typing.cast(list[CargoTomlParser.Value], list_values), stack[i].start, stack[len(stack) - 1].end)
-                        return (stack[:i] + [ new_l ], "list")
-
-                    elif type(s) == CargoTomlParser.Comma:
-                        # The list continious
-                        mode = "list"
-                        i -= 1
-                        continue
-
-                    else:
-                        return (stack[:i], ValueError(f"Invalid list: expected ',' or '[', got {s}"))
-
-                else:
-                    # We don't accept any nonterminals at this stage
-                    return (stack[:i], ValueError(f"Invalid list: expected ',' or '[', got {s}"))
-
-            elif mode == "value":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Equals:
-                        # Yes, good going!
-                        mode = "value_equals"
-                        i -= 1
-                        continue
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-                else:
-                    # No rule (yet)
-                    return (stack, None)
-
-            elif mode == "value_equals":
-                # Switch between token or not
-                if s.is_term:
-                    # Match the type of it
-                    if type(s) == CargoTomlParser.Identifier:
-                        # It's a key/value pair
-                        new_kvp = CargoTomlParser.KeyValuePair(typing.cast(CargoTomlParser.Identifier, stack[i]), typing.cast(CargoTomlParser.Value, stack[i + 2]), stack[i].start, stack[i + 2].end)
-                        return (stack[:i] + [ new_kvp ], "key-value-pair")
-
-                    else:
-                        # No rule (yet)
-                        return (stack, None)
-
-                else:
-                    # No rule (yet)
-                    return (stack, None)
+    def update_to(self, i, force_draw=False) -> None:
+        """
+            Sets the progress bar to the given amount of value (i.e., absolute update).
 
-            else:
-                raise ValueError(f"Unknown mode '{mode}'; this should never happen!")
+            If `force_draw` is False, only redraws every half second. Otherwise, always draws when update() is called.
+        """
 
-        # Nothing to be done
-        return (stack, None)
+        # Update the value
+        self._i = i
+        if self._i < 0: self._i = 0
+        if self._i > self._max: self._i = self._max
 
+        # Redraw if necessary
+        if force_draw or self.should_draw():
+            self.draw()
+            self._last_draw = time.monotonic()
 
-    def parse(self) -> tuple[list[str], list[Exception]]:
+    def stop(self) -> None:
         """
-            Parses the internal Cargo.toml file to extract the list of
-            dependencies from it.
+            Stops the progress bar by writing a newline.
 
-            Returns a list with the depedency folders of the given Cargo.toml,
-            excluding that of the Cargo.toml itself.
+            Always draws (unless progress bars are disabled), then stops drawing forever.
         """
 
-        # Parse the tokens using a shift-reduce parser
-        errs = []
-        stack: list[CargoTomlParser.Symbol] = []
-        while True:
-            # Get a new token
-            token = self._token()
-
-            # Store errors for printing
-            if isinstance(token, Exception):
-                errs.append(token)
-                continue
-            if token is None:
-                break
-
-            # Push it on the stack (shift)
-            stack.append(typing.cast(CargoTomlParser.Symbol, token))
-            # print("Shifted")
-
-            # # Print the stack (debug)
-            # print('[', end="")
-            # for (i, s) in enumerate(stack):
-            #     if i > 0: print(" ", end="")
-            #     print(f"{s}", end="")
-            # print(']\n'); 
-
-            # Now, attempt to (reduce) as much as possible
-            while True:
-                (stack, rule) = self._reduce(stack)
-                if isinstance(rule, Exception):
-                    errs.append(rule)
-                    continue
-                if rule is None:
-                    break
-                # print(f"Applied rule '{rule}'")
-
-                # # Print the stack (debug)
-                # print('[', end="")
-                # for (i, s) in enumerate(stack):
-                #     if i > 0: print(" ", end="")
-                #     print(f"{s}", end="")
-                # print(']\n');
-
-        # Now, in the parsed struct, attempt to extract the local crates
-        paths = []
-        for section in stack:
-            # Make sure everything was parsed to a section
-            if type(section) != CargoTomlParser.Section:
-                errs.append(ValueError(f"Encountered stray symbol '{section}'"))
-                continue
-
-            # Ignore any non-dependency section
-            if section.header.name != "dependencies" and section.header.name != "build-dependencies": continue
-
-            # Iterate over the pairs
-            for dependency in section.pairs:
-                # Skip it the value is not a dict
-                if type(dependency.value.value) != CargoTomlParser.Dict: continue
-
-                # Search the dict for a 'path' identifier
-                for pair in dependency.value.value.pairs:
-                    if pair.key.value != "path": continue
-
-                    # Store the found path as a dependency folder
-                    paths.append(typing.cast(CargoTomlParser.String, pair.value.value).value)
-
-        # Return the result
-        return (paths, errs)
+        self._i = self._max
+        self._last_draw = sys.maxsize * 2 + 1
+        if not live_progress: return
+        self.draw()
+        print()
+
 
 
+    def update_prefix(self, prefix) -> None:
+        """
+            Changes the prefix before the progress bar.
+        """
+
+        self._prefix = prefix
 
 class Arch:
     """
@@ -1685,6 +1138,8 @@ class Arch:
         aliases).
     """
 
+    __slots__ = ( "_arch", "_is_given", "_is_native" )
+
     _arch      : str
     _is_given  : bool
     _is_native : bool
@@ -1718,16 +1173,13 @@ class Arch:
         """
             Returns a new Arch structure that is equal to the one running on the current machine.
 
-            Uses "uname -m" to detect this.
+            Uses the equivalent of "uname -m" to detect this (but without
+            spawning a process, and cached by the platform module).
         """
 
-        # Open the process
-        handle = subprocess.Popen(["uname", "-m"], stdout=subprocess.PIPE, text=True)
-        stdout, _ = handle.communicate()
-
         # Parse the value, put it in an empty Arch object
         arch = Arch()
-        arch._arch = Arch.resolve(stdout)
+        arch._arch = Arch.resolve(platform.machine())
 
         # Overrride the propreties, then return
         arch._is_given  = False
@@ -1751,16 +1203,10 @@ class Arch:
             Resolves the given architecture string to a valid Arch internal string.
         """
 
-        # Get a more forgiving version of the string
-        arch = text.lower().strip()
-
-        # Cast it to the appropriate type or error
-        if arch == "x86_64" or arch == "amd64":
-            return "x86_64"
-        elif arch == "aarch64" or arch == "arm64":
-            return "aarch64"
-        else:
-            raise ValueError(f"Unknown architecture '{text}'")
+        # Look up a more forgiving version of the string, or error
+        arch = ARCH_ALIASES.get(text.lower().strip(), None)
+        if arch is None: raise ValueError(f"Unknown architecture '{text}'")
+        return arch
 
     def is_given(self) -> bool:
         """
@@ -1805,6 +1251,8 @@ class Os:
         Defines a wrapper around an OS string.
     """
 
+    __slots__ = ( "_os", "_is_given", "_is_native" )
+
     _os        : str
     _is_given  : bool
     _is_native : bool
@@ -1843,16 +1291,13 @@ class Os:
         """
             Returns a new Os structure that is equal to the one running on the current machine.
 
-            Uses "uname -s" to detect this.
+            Uses the equivalent of "uname -s" to detect this (but without
+            spawning a process, and cached by the platform module).
         """
 
-        # Open the process
-        handle = subprocess.Popen(["uname", "-s"], stdout=subprocess.PIPE, text=True)
-        stdout, _ = handle.communicate()
-
         # Parse the value, put it in an empty Os object
         os = Os()
-        os._os = Os.resolve(stdout)
+        os._os = Os.resolve(platform.system())
 
         # Overrride the propreties, then return
         os._is_given  = False
@@ -1876,16 +1321,10 @@ class Os:
             Resolves the given OS string to a valid Os internal string.
         """
 
-        # Get a more forgiving version of the string
-        os = text.lower().strip()
-
-        # Cast it to the appropriate type or error
-        if os == "linux":
-            return "linux"
-        elif os == "darwin" or os == "macos":
-            return "darwin"
-        else:
-            raise ValueError(f"Unknown OS '{text}'")
+        # Look up a more forgiving version of the string, or error
+        os = OS_ALIASES.get(text.lower().strip(), None)
+        if os is None: raise ValueError(f"Unknown OS '{text}'")
+        return os
 
     def is_given(self) -> bool:
         """
@@ -1917,6 +1356,8 @@ class Command(abc.ABC):
         Baseclass for Commands, whether virtual or calling some subprocess.
     """
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def __init__(self) -> None:
         # Simply init as empty (no parent stuff)
@@ -1942,6 +1383,8 @@ class ShellCommand(Command):
         Command that runs some shell script.
     """
 
+    __slots__ = ( "_exec", "_args", "_cwd", "_env", "_description" )
+
     _exec        : str
     _args        : list[str]
     _cwd         : str | None
@@ -1979,15 +1422,11 @@ class ShellCommand(Command):
         # Resolve the CWD
         cwd = resolve_args(self._cwd, args) if self._cwd is not None else os.getcwd()
 
-        # Compute the cmd string
-        scmd = self._exec if not " " in self._exec else f"\"{self._exec}\""
-        for arg in self._args:
-            arg = arg.replace("$CMD_CWD", cwd)
-            arg = resolve_args(arg, args)
-            scmd += " " + (arg if not " " in arg else f"\"{arg}\"").replace("\\", "\\\\").replace("\"", "\\\"")
+        # Compute the cmd string (quoted like a shell would need it)
+        scmd = " ".join(shlex.quote(part) for part in [ self._exec ] + [ resolve_args(arg.replace("$CMD_CWD", cwd), args) for arg in self._args ])
 
-        # Compute the env string
-        env = os.environ.copy()
+        # Compute the env string (only reading from the environment, so no need to copy it)
+        env = os.environ
         senv = ""
         for (name, value) in self._env.items():
             # Mark all of these, but only the changes
@@ -1995,12 +1434,11 @@ class ShellCommand(Command):
             if value is None and name not in env: continue
 
             # Possibly replace values
-            if value is not None: value = resolve_args(value, args)
-            svalue = (value if value is not None else '<unset>').replace("\\", "\\\\").replace("\"", "\\\"")
+            svalue = shlex.quote(resolve_args(value, args)) if value is not None else "<unset>"
 
             # Add it to the string
             if len(senv) > 0: senv += " "
-            senv += "{}={}".format(name, svalue if not " " in svalue else f"\"{svalue}\"")
+            senv += f"{name}={svalue}"
 
         # If a description, return that instead
         if self._description is not None:
@@ -2052,8 +1490,8 @@ class ShellCommand(Command):
         # Resolve the CWD
         cwd = resolve_args(self._cwd, args) if self._cwd is not None else os.getcwd()
 
-        # Construct the final environment
-        env = os.environ.copy()
+        # Construct the final environment (if there are no changes, passing None simply inherits ours without copying it)
+        env = os.environ.copy() if len(self._env) > 0 else None
         for (name, value) in self._env.items():
             # Either insert or delete the value
             if value is not None:
@@ -2081,6 +1519,8 @@ class PseudoCommand(Command):
         A command that actually just runs some Python code when executed.
     """
 
+    __slots__ = ( "_desc", "_call" )
+
     _desc : str
     _call : typing.Callable[[], int]
 
@@ -2130,6 +1570,8 @@ class Target(abc.ABC):
         Virtual baseclass for all targets.
     """
 
+    __slots__ = ( "name", "description", "_srcs", "_srcs_deps", "_dsts", "_deps" )
+
     name        : str
     description : str
 
@@ -2179,7 +1621,7 @@ class Target(abc.ABC):
             Child classes may override this method to conditionally return sources.
         """
 
-        return { dep: ((resolve_args(s, args) for s in srcs) if srcs is not None else srcs) for (dep, srcs) in self._srcs_deps.items() }
+        return { dep: ([ resolve_args(s, args) for s in srcs ] if srcs is not None else srcs) for (dep, srcs) in self._srcs_deps.items() }
 
     def dsts(self, args: argparse.Namespace) -> list[str]:
         """
@@ -2211,6 +1653,15 @@ class Target(abc.ABC):
 
         return None
 
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Returns whether this Target may be built at the same time as other Targets (see '--jobs').
+
+            By default, it may not, since we don't know if its commands prompt the user or fight over shared state (like Cargo's build directory).
+        """
+
+        return False
+
 
 
     def is_outdated(self, args: argparse.Namespace) -> bool:
@@ -2228,20 +1679,8 @@ class Target(abc.ABC):
             pdebug(f"Target '{self.name}' is marked as outdated because '--force' was specified")
             return True
 
-        # Examine if any of the sources need to be updated
-        for src in self.srcs(args):
-            # Resolve it
-            src = resolve_args(src, args)
-            # Check if it needs to be recompiled
-            if cache_outdated(args, src, True):
-                pdebug(f"Target '{self.name}' is marked as outdated because source file '{src}' has never been compiled or has changed since last compilation")
-                return True
-
-        # If any of the destination files is missing, that's an indication too
+        # Next, do the cheap checks first: if any of the destination files is missing, that's an indication
         for dst in self.dsts(args):
-            # Resolve it
-            dst = resolve_args(dst, args)
-            # Check if it needs to be recompiled
             if not os.path.exists(dst):
                 pdebug(f"Target '{self.name}' is marked as outdated because result file '{dst}' doesn't exist")
                 return True
@@ -2251,6 +1690,12 @@ class Target(abc.ABC):
             pdebug(f"Target '{self.name}' is marked as outdated because it has never been compiled before or its previous compilation was with different flags")
             return True
 
+        # Only then examine if any of the sources need to be updated, which requires hashing them (all at once, so their files are hashed in parallel)
+        src = first_cache_outdated(args, self.srcs(args), True)
+        if src is not None:
+            pdebug(f"Target '{self.name}' is marked as outdated because source file '{src}' has never been compiled or has changed since last compilation")
+            return True
+
         # Otherwise, it's left to the child-specific implementation
         return self._is_outdated(args)
 
@@ -2283,14 +1728,11 @@ class Target(abc.ABC):
                 new_dsts.append(f)
             dsts = new_dsts
 
-        # Examine if any of the remaining destination's cache has become outdated
-        for dst in dsts:
-            # Resolve it
-            dst = resolve_args(dst, args)
-            # Check if it was changed
-            if cache_outdated(args, dst, True):
-                pdebug(f"Rebuild of target '{self.name}' is marked as having an effect because the hash of resulting file '{dst}' has changed")
-                return True
+        # Examine if any of the remaining destination's cache has become outdated (all at once, so their files are hashed in parallel)
+        dst = first_cache_outdated(args, [ resolve_args(dst, args) for dst in dsts ], True)
+        if dst is not None:
+            pdebug(f"Rebuild of target '{self.name}' is marked as having an effect because the hash of resulting file '{dst}' has changed")
+            return True
 
         # Otherwise, check the child-dependent implementation
         return self._had_effect(args)
@@ -2342,29 +1784,25 @@ class Target(abc.ABC):
             Updates caches and such if the Target was successfull.
         """
 
-        # Compute some colour strings
-        debug_start = "\033[1m" if supports_color() else ""
-        error_start = "\033[31;1m" if supports_color() else ""
-        end         = "\033[0m" if supports_color() else ""
-
         # Get the commands to run to compile this target and execute them one-by-one
         cmds = self._cmds(args)
         for cmd in cmds:
-            print(f" > {debug_start}{cmd.serialize(args)}{end}")
+            scmd = cmd.serialize(args)
+            with print_lock: print(f" > {BOLD_START}{scmd}{COLOUR_END}")
 
             # Run it
             res = cmd.run(args)
             if res != 0:
-                print(f"\n{debug_start}Job '{error_start}{cmd.serialize(args)}{end}{debug_start}' failed. See output above.{end}\n", file=sys.stderr)
+                with print_lock: print(f"\n{BOLD_START}Job '{FAILED_START}{scmd}{COLOUR_END}{BOLD_START}' failed. See output above.{COLOUR_END}\n", file=sys.stderr)
                 exit(1)
 
         # Now update the sources
         srcs = self.srcs(args)
-        for srcs_deps in self.srcs_deps(args).values(): srcs += srcs_deps
+        for srcs_deps in self.srcs_deps(args).values():
+            # Dependencies on which we rely as a whole don't have specific files for us to cache
+            if srcs_deps is not None: srcs += srcs_deps
         for src in srcs:
-            # Resolve it
-            src = resolve_args(src, args)
-            # Update it
+            # Update it (the sources are already resolved)
             update_cache(args, src, True)
 
         # And the flags
@@ -2387,6 +1825,8 @@ class AbstractTarget(Target):
         other targets.
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str, deps: list[str], description: str = "") -> None:
         """
             Constructor for the AbstractTarget.
@@ -2421,7 +1861,7 @@ class AbstractTarget(Target):
         # Run the function on that target instead
         return (target.srcs(args) if self != target else super().srcs(args))
 
-    def srcs_deps(self, _args: argparse.Namespace) -> dict[str, list[str] | None]:
+    def srcs_deps(self, args: argparse.Namespace) -> dict[str, list[str] | None]:
         """
             Returns a dict that maps dependency-generated source files upon which this Target relies.
 
@@ -2433,7 +1873,7 @@ class AbstractTarget(Target):
         # Run the function on that target instead
         return (target.srcs_deps(args) if self != target else super().srcs_deps(args))
 
-    def dsts(self, _args: argparse.Namespace) -> list[str]:
+    def dsts(self, args: argparse.Namespace) -> list[str]:
         """
             Returns the list of source files upon which this Target relies.
 
@@ -2445,7 +1885,7 @@ class AbstractTarget(Target):
         # Run the function on that target instead
         return (target.dsts(args) if self != target else super().dsts(args))
 
-    def deps(self, _args: argparse.Namespace) -> list[str]:
+    def deps(self, args: argparse.Namespace) -> list[str]:
         """
             Returns the dependencies of this Target.
 
@@ -2459,6 +1899,18 @@ class AbstractTarget(Target):
 
 
 
+    def allows_parallel(self, args: argparse.Namespace) -> bool:
+        """
+            Returns whether this Target may be built at the same time as other Targets (see '--jobs').
+        """
+
+        # Redirect the Target
+        target = self.redirect(args)
+        # Delegate it to it
+        return (target.allows_parallel(args) if self != target else super().allows_parallel(args))
+
+
+
     def is_outdated(self, args: argparse.Namespace) -> bool:
         """
             Checks if the Target needs to be rebuild according to the common
@@ -2519,6 +1971,8 @@ class VoidTarget(AbstractTarget):
         A target that does nothing, but can be used to call dependencies.
     """
 
+    __slots__ = ()
+
 
     def __init__(self, name: str, deps: list[str] = [], description: str = "") -> None:
         """
@@ -2559,6 +2013,8 @@ class EitherTarget(AbstractTarget):
         Defines a build target that can switch between two different targets based on some runtime property.
     """
 
+    __slots__ = ( "_targets", "_opt_name" )
+
     _targets  : dict[typing.Any, Target]
     _opt_name : str
 
@@ -2587,13 +2043,12 @@ class EitherTarget(AbstractTarget):
             Redirects this AbstractTarget to a real target that will actually be build.
         """
 
-        # Check which one based on the given set of arguments
+        # Check which one based on the given set of arguments (in a single lookup, since this is called for every query on the Target)
         val = getattr(args, self._opt_name)
-        if val not in self._targets:
-            raise ValueError(f"Value '{val}' is not a possible target for EitherTarget '{self.name}'")
-
-        # No redirection needs to happen
-        return self._targets[val]
+        try:
+            return self._targets[val]
+        except KeyError:
+            raise ValueError(f"Value '{val}' is not a possible target for EitherTarget '{self.name}'") from None
 
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
         """
@@ -2616,6 +2071,8 @@ class ShellTarget(Target):
         A very simple Target that executed one or more Commands.
     """
 
+    __slots__ = ( "_commands", )
+
     _commands : list[Command]
 
 
@@ -2641,12 +2098,34 @@ class ShellTarget(Target):
 
 
 
-    def _is_outdated(self, _args: argparse.Namespace) -> bool:
+    def _is_outdated(self, args: argparse.Namespace) -> bool:
         """
-            The ShellTarget is always outdated, since we have no guarantees about what it does
+            The ShellTarget is always outdated, since we have no guarantees about what it does, unless it declares both what it reads and what it writes.
+
+            In that case, the source and flag caches already checked in 'is_outdated()' tell us if its inputs changed, and we check here that its results are still the ones it produced the last time it ran (other Targets may write the same files).
         """
-        pdebug(f"Target '{self.name}' is marked as outdated because it executes arbitrary commands and we don't know when to execute them")
-        return True
+        if not (self._srcs or self._srcs_deps) or not self._dsts:
+            pdebug(f"Target '{self.name}' is marked as outdated because it executes arbitrary commands and we don't know when to execute them")
+            return True
+
+        # Compare the results with the hashes recorded for this Target specifically
+        hash_cache = os.path.abspath(args.cache + f"/dsts/{self.name}")
+        for dst in self.dsts(args):
+            if not os.path.isfile(dst) or file_cache_outdated(hash_cache, dst):
+                pdebug(f"Target '{self.name}' is marked as outdated because result file '{dst}' is not the one it produced the last time it ran")
+                return True
+        return False
+
+    def build(self, args: argparse.Namespace):
+        """
+            Builds the target like any other, but also remembers the results it produced (see '_is_outdated()').
+        """
+
+        super().build(args)
+        if (self._srcs or self._srcs_deps) and self._dsts:
+            hash_cache = os.path.abspath(args.cache + f"/dsts/{self.name}")
+            for dst in self.dsts(args):
+                if os.path.isfile(dst): update_file_cache(hash_cache, dst)
 
     def _cmds(self, _args: argparse.Namespace) -> list[Command]:
         """
@@ -2664,6 +2143,8 @@ class CrateTarget(Target):
         Defines a build target that relies on Cargo for build caching.
     """
 
+    __slots__ = ( "_pkgs", "_target", "_give_target_on_unspecified", "_force_dev", "_env", "_support_checker" )
+
     _pkgs                       : list[str]
     _target                     : str | None
     _give_target_on_unspecified : bool
@@ -2709,10 +2190,9 @@ class CrateTarget(Target):
     def is_supported(self, args: argparse.Namespace) -> str | None:
         # Check if Cargo and Rust are installed
         for (name, exe) in [ ("Cargo", "cargo"), ("Rust compiler", "rustc"), ("Package config", "pkgconf") ]:
-            handle = subprocess.Popen([ exe, "--version" ], text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            (stdout, stderr) = handle.communicate()
-            if handle.returncode != 0:
-                return f"{name} ({exe}) cannot be run: {stderr}"
+            err = probe_executable(exe)
+            if err is not None:
+                return f"{name} ({exe}) cannot be run: {err}"
 
         # Now check for any target-specific options
         return self._support_checker(self, args)
@@ -2734,11 +2214,17 @@ class CrateTarget(Target):
             Will raise errors if it somehow fails to do so.
         """
 
+        # Release builds are never iterated upon, so don't let Cargo write incremental artifacts for them (unless the Target says otherwise)
+        release = not self._force_dev and not args.dev
+        env     = self._env
+        if release and "CARGO_INCREMENTAL" not in env:
+            env = { **env, "CARGO_INCREMENTAL": "0" }
+
         # Start collecting the arguments for cargo
-        cmd = ShellCommand("cargo", "build", env=self._env)
+        cmd = ShellCommand("cargo", "build", env=env)
         if self._target is not None and (args.arch.is_given() or self._give_target_on_unspecified):
             cmd.add("--target", resolve_args(self._target, args))
-        if not self._force_dev and not args.dev:
+        if release:
             cmd.add("--release")
         for pkg in self._pkgs:
             cmd.add("--package", pkg)
@@ -2751,6 +2237,8 @@ class DownloadTarget(Target):
         Defines a build target that downloads a file.
     """
 
+    __slots__ = ( "_addr", )
+
     _addr : str
 
 
@@ -2774,14 +2262,31 @@ class DownloadTarget(Target):
 
 
 
-    def _is_outdated(self, _args: argparse.Namespace) -> bool:
+    def _is_outdated(self, args: argparse.Namespace) -> bool:
+        """
+            The DownloadTarget is outdated if the file was not downloaded from the current address before, or if it has changed since.
+
+            We don't know anything about the remote file itself, so we assume the same address keeps serving the same file.
+        """
+
+        if download_changed(args, self.name, resolve_args(self._addr, args), resolve_args(self._dsts[0], args)):
+            pdebug(f"Target '{self.name}' is marked as outdated because its asset was not downloaded from '{resolve_args(self._addr, args)}' or has changed since")
+            return True
+        return False
+
+    def build(self, args: argparse.Namespace):
+        """
+            Builds the target like any other, but also remembers where the resulting file came from.
         """
-            The DownloadTarget is always outdated, since we don't know anything about the source before downloading.
 
-            We will probably do something more clever in the future, though.
+        super().build(args)
+        update_download(args, self.name, resolve_args(self._addr, args), resolve_args(self._dsts[0], args))
+
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Downloads only wait for the network, so they may run alongside other Targets.
         """
 
-        pdebug(f"Target '{self.name}' is marked as outdated because it relies on a to-be-downloaded asset")
         return True
 
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
@@ -2796,32 +2301,50 @@ class DownloadTarget(Target):
         addr    = resolve_args(self._addr, args)
         outfile = resolve_args(self._dsts[0], args)
         def get_file() -> int:
-            res = urllib.request.urlopen(addr)
-
             # Run the request
             try:
+                (url, res) = http_get(addr)
                 with open(outfile, "wb") as f:
                     # Make sure it succeeded
                     if res.status != 200:
-                        cancel(f"Failed to download file: server returned exit code {res.status} ({http.client.responses[res.status]}): {res.reason}")
+                        cancel(f"Failed to download file: server returned exit code {res.status} ({res.reason})")
 
                     # Iterate over the result
-                    print(f"   (File size: {to_bytes(int(res.headers['Content-length']))})")
-                    prgs = ProgressBar(stop=int(res.headers['Content-length']), prefix=" " * 13)
-                    chunk_start = time.time()
-                    chunk = res.read(65535)
-                    while(len(chunk) > 0):
-                        # Write the chunk (timed)
-                        chunk_time = time.time() - chunk_start
-                        f.write(chunk)
-                        chunk_start = time.time()
-
-                        # Update the progressbar
-                        prgs.update_prefix(f"   {to_bytes(int(len(chunk) * (1 / chunk_time))).rjust(10)}/s ")
-                        prgs.update(len(chunk))
-
-                        # Fetch the next chunk
-                        chunk = res.read(65535)
+                    size = int(res.headers['Content-length'])
+                    with print_lock: print(f"   (File size: {to_bytes(size)})")
+                    prgs = ProgressBar(stop=size, prefix=" " * 13)
+
+                    # Large files are fetched as parallel byte ranges if the (redirected) server supports it
+                    if size >= 2 * DOWNLOAD_CHUNK_SIZE and res.headers.get("Accept-Ranges") == "bytes":
+                        res.close()
+                        download_ranges(url, f, size, prgs)
+                        prgs.stop()
+                        return 0
+
+                    # Otherwise, stream it in large blocks while a separate thread samples the number of bytes written on a fixed cadence
+                    written = 0
+                    stop    = threading.Event()
+                    def report() -> None:
+                        (last_time, last_pos, rate) = (time.monotonic(), 0, None)
+                        while not stop.wait(DOWNLOAD_SAMPLE_INTERVAL):
+                            (now, pos) = (time.monotonic(), written)
+                            rate = smooth_rate(rate, (pos - last_pos) / (now - last_time))
+                            prgs.update_prefix(f"   {to_bytes(int(rate)).rjust(10)}/s ")
+                            prgs.update_to(pos)
+                            (last_time, last_pos) = (now, pos)
+                    reporter = threading.Thread(target=report, daemon=True) if live_progress else None
+                    if reporter is not None: reporter.start()
+                    try:
+                        buffer = memoryview(bytearray(DOWNLOAD_BLOCK_SIZE))
+                        while True:
+                            n = res.readinto(buffer)
+                            if not n: break
+                            if build_cancelled.is_set(): raise KeyboardInterrupt()
+                            f.write(buffer[:n])
+                            written += n
+                    finally:
+                        stop.set()
+                        if reporter is not None: reporter.join()
                     prgs.stop()
 
             # # Catch request Errors
@@ -2830,11 +2353,11 @@ class DownloadTarget(Target):
 
             # Catch IO Errors
             except IOError as e:
-                cancel(f"Failed to download file: {e}", code=e.errno)
+                cancel(f"Failed to download file: {e}", code=e.errno if e.errno is not None else 1)
 
             # Catch KeyboardInterrupt
             except KeyboardInterrupt as e:
-                print("\n > Rolling back file download...")
+                with print_lock: print("\n > Rolling back file download...")
                 try:
                     os.remove(outfile)
                 except IOError as e2:
@@ -2855,13 +2378,16 @@ class ImageTarget(Target):
         Target that builds an image according to a Dockerfile.
     """
 
+    __slots__ = ( "_dockerfile", "_context", "_target", "_build_args", "_srcs_toml" )
+
     _dockerfile  : str
     _context     : str
     _target      : str | None
     _build_args  : dict[str, str]
+    _srcs_toml   : str | None
 
 
-    def __init__(self, name: str, dockerfile: str, destination: str, context: str = ".", target: str | None = None, build_args: dict[str, str] = {}, srcs: list[str] = [], srcs_deps: dict[str, list[str] | None] = {}, deps: list[str] = [], description: str = ""):
+    def __init__(self, name: str, dockerfile: str, destination: str, context: str = ".", target: str | None = None, build_args: dict[str, str] = {}, srcs: list[str] = [], srcs_toml: str | None = None, srcs_deps: dict[str, list[str] | None] = {}, deps: list[str] = [], description: str = ""):
         """
             Constructor for the ImageTarget.
 
@@ -2873,6 +2399,7 @@ class ImageTarget(Target):
             - `target`: The Docker target to build in the Dockerfile. Will build the default target if omitted.
             - `build_args`: A list of build arguments to set when building the Dockerfile.
             - `srcs`: A list of source files which the Target uses. Their state is cached, and any change to these sources will prompt a rebuild of this Target. If the list is empty, then it is assumed this information is unknown, and the Target must always be rebuild.
+            - `srcs_toml`: If given, the path to a Cargo.toml file whose crate and local dependencies are added to the source files. They are only deduced once the sources are actually needed.
             - `srcs_deps`: A list of source files that are produced by a dependency. The dictionary maps dependency names to a list of source files for that dependency. If the list is 'None' instead, then we rely on all files built by the dep. Note that dep-specific behaviour may always override and tell its parents to rebuild.
             - `deps`: A list of dependencies for the Target. If any of these strong dependencies needs to be recompiled _any_ incurred changes, then this Target will be rebuild as well.
             - `description`: If a non-empty string, then it's a description of the target s.t. it shows up in the list of all Targets.
@@ -2886,9 +2413,37 @@ class ImageTarget(Target):
         self._context     = context
         self._target      = target
         self._build_args  = build_args
+        self._srcs_toml   = srcs_toml
+
+
+
+    def srcs(self, args: argparse.Namespace) -> list[str]:
+        """
+            Returns the list of source files upon which this Target relies, including the crates deduced from its Cargo.toml (if any).
+        """
+
+        srcs = super().srcs(args)
+        if self._srcs_toml is not None:
+            crates = deduce_toml_src_dirs(self._srcs_toml)
+            if crates is None: cancel(f"Could not auto-deduce '{self.name}' dependencies")
+            srcs += crates
+        return srcs
+
+    def is_supported(self, _args: argparse.Namespace) -> str | None:
+        # Deducing sources from a Cargo.toml requires a TOML parser
+        if self._srcs_toml is not None and tomllib is None:
+            return "Deducing the image's sources from its Cargo.toml requires Python 3.11 or newer, or the 'tomli' package"
+        return None
 
 
 
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Docker builds images concurrently just fine, so they may run alongside other Targets.
+        """
+
+        return True
+
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
         """
             Returns the commands to run to build the target given the given
@@ -2897,11 +2452,15 @@ class ImageTarget(Target):
             Will raise errors if it somehow fails to do so.
         """
 
+        # Make sure we can deduce the sources before spending minutes on a build (they are cached afterwards)
+        self.srcs(args)
+
         # Resolve the destination path
         destination = resolve_args(self._dsts[0], args)
 
-        # Add a command for the output folder
-        mkdir = ShellCommand("mkdir", "-p", f"{os.path.dirname(destination)}")
+        # Add a command for the output folder (created in-process instead of spawning 'mkdir')
+        folder = os.path.dirname(destination)
+        mkdir  = PseudoCommand(f"Creating directory '{folder}'...", lambda: 0 if args.dry_run else ensure_dir(folder))
 
         # Construct the build command
         build = ShellCommand("docker", "build", "--output", f"type=docker,dest={destination}", "-f", self._dockerfile)
@@ -2922,6 +2481,8 @@ class ImagePullTarget(Target):
         Defines a build target that saves an image from a remote repository to a local .tar file.
     """
 
+    __slots__ = ( "_registry", )
+
     _registry : str
 
 
@@ -2945,6 +2506,13 @@ class ImagePullTarget(Target):
 
 
 
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Pulls only wait for the network, so they may run alongside other Targets.
+        """
+
+        return True
+
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
         """
             Returns the commands to run to build the target given the given
@@ -2953,8 +2521,22 @@ class ImagePullTarget(Target):
             Will raise errors if it somehow fails to do so.
         """
 
-        # Generate the three commands
-        mkdir = ShellCommand("mkdir", "-p", f"{os.path.dirname(self._dsts[0])}")
+        # Create the output folder (in-process instead of spawning 'mkdir')
+        folder = os.path.dirname(self._dsts[0])
+        mkdir = PseudoCommand(f"Creating directory '{folder}'...", lambda: 0 if args.dry_run else ensure_dir(folder))
+
+        # If skopeo is installed, stream the image straight from the registry to the .tar file instead of unpacking it in the Docker engine and packing it again
+        if probe_executable("skopeo") is None:
+            output = self._dsts[0]
+            def remove_old() -> int:
+                # skopeo refuses to write to an existing archive
+                if not args.dry_run and os.path.exists(output): os.remove(output)
+                return 0
+            remove = PseudoCommand(f"Removing old '{output}'...", remove_old)
+            copy   = ShellCommand("skopeo", "copy", f"docker://{self._registry}", f"docker-archive:{output}:{self._registry}")
+            return [ mkdir, remove, copy ]
+
+        # Otherwise, go through Docker
         pull  = ShellCommand("docker", "pull", f"{self._registry}")
         save  = ShellCommand("docker", "save", "--output", f"{self._dsts[0]}", f"{self._registry}")
 
@@ -2966,6 +2548,8 @@ class InContainerTarget(Target):
         Target that builds something in a container (e.g., OpenSSL).
     """
 
+    __slots__ = ( "_image", "_attach_stdin", "_attach_stdout", "_attach_stderr", "_keep_alive", "_volumes", "_context", "_command" )
+
     _image         : str
     _attach_stdin  : bool
     _attach_stdout : bool
@@ -3020,17 +2604,9 @@ class InContainerTarget(Target):
             Will raise errors if it somehow fails to do so.
         """
 
-        # Get the current user ID
-        handle = subprocess.Popen(["id", "-u"], text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        (stdout, stderr) = handle.communicate()
-        if handle.returncode != 0: cancel(f"Failed to get current user ID using 'id -u':\n{stderr}")
-        uid = stdout.strip()
-
-        # Get the current group ID
-        handle = subprocess.Popen(["id", "-g"], text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        (stdout, stderr) = handle.communicate()
-        if handle.returncode != 0: cancel(f"Failed to get current group ID using 'id -u':\n{stderr}")
-        gid = stdout.strip()
+        # Get the current user and group IDs (straight from the kernel instead of calling 'id')
+        uid = os.getuid()
+        gid = os.getgid()
 
 
 
@@ -3105,6 +2681,8 @@ class InstallTarget(Target):
         Target that installs something (i.e., copies it to a target system folder).
     """
 
+    __slots__ = ( "_need_sudo", )
+
     _need_sudo : bool
 
 
@@ -3129,6 +2707,13 @@ class InstallTarget(Target):
 
 
 
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Copies may run alongside other Targets, unless they need sudo (which may prompt for a password).
+        """
+
+        return not self._need_sudo
+
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
         """
             Returns the commands to run to build the target given the given
@@ -3141,14 +2726,24 @@ class InstallTarget(Target):
         source = resolve_args(typing.cast(list[str], self._srcs_deps[self._deps[0]])[0], args)
         target = resolve_args(self._dsts[0], args)
 
-        # Add a command that makes the directory
-        mkdir = ShellCommand("sudo" if self._need_sudo else "mkdir")
-        if self._need_sudo: mkdir.add("mkdir")
+        # If we don't need sudo, copy the file in-process (shutil lets the kernel copy the bytes using sendfile)
+        if not self._need_sudo:
+            def install_file() -> int:
+                if args.dry_run: return 0
+                try:
+                    ensure_dir(os.path.dirname(target))
+                    shutil.copy(source, target)
+                except IOError as e:
+                    cancel(f"Failed to copy '{source}' to '{target}': {e}", code=e.errno if e.errno is not None else 1)
+                return 0
+            return [ PseudoCommand(f"Copying '{source}' to '{target}'...", install_file) ]
+
+        # Otherwise, add a command that makes the directory
+        mkdir = ShellCommand("sudo", "mkdir")
         mkdir.add("-p", os.path.dirname(target))
 
         # Prepare the command
-        cmd = ShellCommand("sudo" if self._need_sudo else "cp")
-        if self._need_sudo: cmd.add("cp")
+        cmd = ShellCommand("sudo", "cp")
         cmd.add(source, target)
 
         # Done, return it
@@ -3159,6 +2754,8 @@ class InstallImageTarget(Target):
         Target that installs something (i.e., copies it to a target system folder).
     """
 
+    __slots__ = ( "_tag", )
+
     _tag : str
 
 
@@ -3182,6 +2779,13 @@ class InstallImageTarget(Target):
 
 
 
+    def allows_parallel(self, _args: argparse.Namespace) -> bool:
+        """
+            Loading images into Docker may run alongside other Targets.
+        """
+
+        return True
+
     def _cmds(self, args: argparse.Namespace) -> list[Command]:
         """
             Returns the commands to run to build the target given the given
@@ -3211,13 +2815,29 @@ class InstallImageTarget(Target):
 # Whether to print debug messages or not
 debug: bool = False
 
-# A list of deduced sources
-instance_srcs = {
-    f"{svc}" : deduce_toml_src_dirs(f"./brane-{svc}/Cargo.toml")
-    for svc in CENTRAL_SERVICES + WORKER_SERVICES
-}
-for svc in instance_srcs:
-    if instance_srcs[svc] is None: cancel(f"Could not auto-deduce '{svc}-image' dependencies")
+# The per-thread read buffers used by hash_file() (if hashlib cannot read the file by itself)
+hash_buffers = threading.local()
+
+# The per-thread HTTP connections used by http_get(), by (scheme, host) (together with the last response on them)
+http_connections = threading.local()
+
+# The hashes computed during this run, by (path, modification time, size) (see memoized_hash_file())
+hash_memo: dict[tuple[str, int, int], str] = {}
+
+# Serializes the messages printed by Targets that are built at the same time (see build_target())
+print_lock = threading.RLock()
+
+# Set when the user interrupts a parallel build, so the Targets running in worker threads stop (and roll back) as well
+build_cancelled = threading.Event()
+
+# Whether progress bars are drawn. Disabled while multiple Targets are built at the same time, since they would all draw over the same line
+live_progress: bool = True
+
+# The directories created during this run (see ensure_dir())
+created_dirs: set[str] = set()
+
+# The flags cache files read or written during this run, mapped to their contents
+flags_memo: dict[str, dict[str, typing.Any]] = {}
 
 # A list of all targets in the make file.
 targets = {
@@ -3422,7 +3042,7 @@ for svc in CENTRAL_SERVICES + WORKER_SERVICES:
         "dev", {
             False : ImageTarget(f"{svc}-image-release",
                 "./Dockerfile.rls", f"./target/release/brane-{svc}.tar", target=f"brane-{svc}",
-                srcs=typing.cast(list[str], instance_srcs[svc]),
+                srcs_toml=f"./brane-{svc}/Cargo.toml",
             ),
             True  : ImageTarget(f"{svc}-image-debug",
                 "./Dockerfile.dev", f"./target/debug/brane-{svc}.tar", target=f"brane-{svc}", build_args={ "ARCH": "$ARCH" },
@@ -3771,6 +3391,7 @@ def build_target(target_name, args) -> int:
 
         This function acts as the 'main' function of the script.
     """
+    global live_progress
 
     # Do a warning
     if args.dry_run:
@@ -3780,13 +3401,38 @@ def build_target(target_name, args) -> int:
     todo = deduce_build_steps(target_name, args)
     pdebug("To build: " + (", ".join([", ".join([f"'{target.name}'{'?' if not outdated else ''}" for (target, outdated) in step]) for step in todo]) if len(todo) > 0 else "<nothing>"))
     for step in todo:
-        # Build all of these (order doesn't matter, in case we go multi-thread one day)
+        # Collect the ones to build in this step (order doesn't matter, since they don't depend on each other)
+        parallel = []
+        serial   = []
         for (target, outdated) in step:
             # If the target is not outdated, check if it needs to be rebuild according to its dependencies
             if not outdated and not target.deps_outdated(args): continue
             if not outdated: pdebug(f"Target '{target.name}' is marked as outdated because one of its dependencies was rebuild triggering relevant changes")
 
-            # Otherwise, something wanted us to build it so do it
+            # Otherwise, something wanted us to build it so do it (at the same time as others if it and the user allow it)
+            if args.jobs > 1 and target.allows_parallel(args):
+                parallel.append(target)
+            else:
+                serial.append(target)
+
+        # Build the ones that may run at the same time first, then the rest one-by-one
+        if len(parallel) > 1:
+            live_progress = False
+            pool = concurrent.futures.ThreadPoolExecutor(min(args.jobs, len(parallel)))
+            try:
+                for future in [ pool.submit(target.build, args) for target in parallel ]:
+                    # Propagate any failures (including the exit() of a failed command)
+                    future.result()
+            except KeyboardInterrupt:
+                # Only the main thread is interrupted, so tell the Targets in the workers to stop (and roll back) as well
+                build_cancelled.set()
+                raise
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+                live_progress = True
+        else:
+            serial = parallel + serial
+        for target in serial:
             target.build(args)
 
     # Success!
@@ -3820,6 +3466,7 @@ if __name__ == "__main__":
     parser.add_argument("-o", "--os", help=f"Determines the OS for which to compile. Only relevant for the Brane-CLI. By default, will be the host's OS (host OS: '{Os.host()}')")
     parser.add_argument("-a", "--arch", help=f"The target architecture for which to compile. By default, will be the host's architecture (host architecture: '{Arch.host()}')")
     parser.add_argument("-c", "--cache", default="./target/make_cache", help="The location of the cache location for file hashes and such.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="The maximum number of independent Targets to build at the same time. Only Targets that don't need user input or fight over shared state (such as downloads, image builds and pulls) are built in parallel; the others are always built one-by-one. Note that the output of the commands of parallel Targets may be interleaved, and that no progress bars are shown while they run.")
 
     # Resolve arguments
     args = parser.parse_args()